@@ -0,0 +1,114 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from heredity import compute_probabilities, inheritance_table, load_data
+from sampling import gibbs_sampling, likelihood_weighting
+
+SAMPLES = 10000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score every family in a directory or glob pattern."
+    )
+    parser.add_argument("pattern", help="directory of CSV files or glob")
+    parser.add_argument("engine", nargs="?", default="exact",
+                        choices=list(ENGINES))
+    parser.add_argument("--samples", type=int, default=SAMPLES,
+                        help=f"samples per family (default {SAMPLES})")
+    parser.add_argument("--output", help="JSON Lines file (default stdout)")
+    args = parser.parse_args()
+    if args.samples < 1:
+        parser.error("number of samples must be positive")
+    filenames = family_files(args.pattern)
+    if not filenames:
+        sys.exit(f"No family files match {args.pattern}")
+
+    start = time.perf_counter()
+    if args.output:
+        with open(args.output, "w") as f:
+            count = run_batch(filenames, args.engine, args.samples, f)
+    else:
+        count = run_batch(filenames, args.engine, args.samples, sys.stdout)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {count} families in {elapsed:.2f}s", file=sys.stderr)
+
+
+def family_files(pattern):
+    """
+    Return a sorted list of CSV files, given either a directory
+    (every .csv file in it) or a glob pattern.
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.csv")
+    return sorted(glob.glob(pattern))
+
+
+def exact(people, samples):
+    return compute_probabilities(people), None
+
+
+def sampled(sampler):
+    def run(people, samples):
+        for _, probabilities, errors in sampler(
+            people, samples, report_every=samples
+        ):
+            pass
+        return probabilities, errors
+    return run
+
+
+ENGINES = {
+    "exact": exact,
+    "lw": sampled(likelihood_weighting),
+    "gibbs": sampled(gibbs_sampling),
+}
+
+
+def score_family(job):
+    """
+    Run inference on one family file and return its JSON-ready result,
+    including how long loading and inference took.
+    """
+    filename, engine, samples = job
+    start = time.perf_counter()
+    people = load_data(filename)
+    probabilities, errors = ENGINES[engine](people, samples)
+    result = {
+        "family": filename,
+        "people": len(people),
+        "engine": engine,
+        "seconds": time.perf_counter() - start,
+        "probabilities": probabilities,
+    }
+    if errors is not None:
+        result["errors"] = errors
+    return result
+
+
+def run_batch(filenames, engine, samples, output, processes=None):
+    """
+    Score every file in `filenames` in parallel, writing one JSON line
+    per family to `output` as soon as it finishes. Return the count.
+
+    The inheritance table is built in this process before the pool
+    starts; forked workers inherit it, spawned ones build it once each.
+    """
+    inheritance_table()
+    count = 0
+    with multiprocessing.Pool(processes) as pool:
+        jobs = [(filename, engine, samples) for filename in filenames]
+        for result in pool.imap_unordered(score_family, jobs):
+            output.write(json.dumps(result, allow_nan=False) + "\n")
+            output.flush()
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import random
+import sys
+import time
+import tracemalloc
+
+import heredity
+from generate import generate_family
+from query import PedigreeQuery
+from sampling import gibbs_sampling, likelihood_weighting
+
+SIZES = [2, 3, 4, 5, 6, 7, 10, 20, 50, 100]
+EXACT_LIMIT = 7
+SAMPLES = 5000
+EVIDENCE = 0.5
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [max_size] [seed]")
+    max_size = int(sys.argv[1]) if len(sys.argv) >= 2 else max(SIZES)
+    random.seed(int(sys.argv[2]) if len(sys.argv) == 3 else 0)
+
+    print(f"{'size':>5} {'engine':>8} {'seconds':>9} {'peak KiB':>9} "
+          f"{'joint calls':>11} {'max diff':>9}  agrees")
+    for size in [s for s in SIZES if s <= max_size]:
+        people = generate_family(size, EVIDENCE)
+        for row in benchmark_family(people):
+            print(f"{size:>5} {row['engine']:>8} {row['seconds']:>9.4f} "
+                  f"{row['peak'] / 1024:>9.1f} {row['calls']:>11} "
+                  f"{row['difference']:>9.4f}  {row['agrees']}")
+
+
+def exact(people):
+    return heredity.compute_probabilities(people), None
+
+
+def junction_tree(people):
+    return PedigreeQuery(people).marginals(), None
+
+
+def sampled(sampler):
+    def run(people):
+        for _, probabilities, errors in sampler(
+            people, SAMPLES, report_every=SAMPLES
+        ):
+            pass
+        return probabilities, errors
+    return run
+
+
+ENGINES = {
+    "exact": exact,
+    "junction": junction_tree,
+    "lw": sampled(likelihood_weighting),
+    "gibbs": sampled(gibbs_sampling),
+}
+
+
+def measure(engine, people):
+    """
+    Run `engine` on `people`, returning its result along with the wall
+    time, peak traced memory and number of calls to `joint_probability`.
+    """
+    calls = 0
+    joint_probability = heredity.joint_probability
+
+    def counted(*args):
+        nonlocal calls
+        calls += 1
+        return joint_probability(*args)
+
+    heredity.joint_probability = counted
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        probabilities, errors = engine(people)
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        heredity.joint_probability = joint_probability
+    return probabilities, errors, elapsed, peak, calls
+
+
+def benchmark_family(people):
+    """
+    Run every engine on `people` and return one row per engine.
+
+    The exact engine only runs up to `EXACT_LIMIT` people; beyond that the
+    junction tree is the reference. Exact engines must agree to 1e-9, and
+    sampling engines to within four standard errors (or 0.01, whichever
+    is larger) on every entry.
+    """
+    rows = []
+    reference = None
+    for name, engine in ENGINES.items():
+        if name == "exact" and len(people) > EXACT_LIMIT:
+            continue
+        probabilities, errors, elapsed, peak, calls = measure(engine, people)
+        if reference is None:
+            reference = probabilities
+
+        difference = 0
+        agrees = True
+        for person in people:
+            for field in reference[person]:
+                for value in reference[person][field]:
+                    diff = abs(probabilities[person][field][value] -
+                               reference[person][field][value])
+                    difference = max(difference, diff)
+                    tolerance = 1e-9 if errors is None else \
+                        max(4 * errors[person][field][value], 0.01)
+                    if diff > tolerance:
+                        agrees = False
+
+        rows.append({
+            "engine": name,
+            "seconds": elapsed,
+            "peak": peak,
+            "calls": calls,
+            "difference": difference,
+            "agrees": agrees,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    main()
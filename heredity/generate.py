@@ -0,0 +1,92 @@
+import csv
+import random
+import sys
+
+from heredity import PROBS, inheritance_table
+
+GENERATIONS = 3
+EVIDENCE = 0.5
+
+
+def main():
+    if len(sys.argv) not in [3, 4, 5]:
+        sys.exit("Usage: python generate.py size output.csv "
+                 "[evidence] [seed]")
+    size = int(sys.argv[1])
+    evidence = float(sys.argv[3]) if len(sys.argv) >= 4 else EVIDENCE
+    if len(sys.argv) == 5:
+        random.seed(int(sys.argv[4]))
+    save_data(generate_family(size, evidence), sys.argv[2])
+
+
+def generate_family(size, evidence=EVIDENCE, generations=GENERATIONS):
+    """
+    Return a random multi-generation pedigree of `size` people in the
+    same format as `heredity.load_data`.
+
+    The founders pair up into couples who have children; each later
+    generation pairs its members with each other or with people marrying
+    into the family, until `size` people exist. Genes and traits are
+    drawn from the model in `PROBS`, and each person's trait is then
+    kept with probability `evidence` and hidden otherwise.
+    """
+    people = {}
+    genes = {}
+
+    def add(mother=None, father=None):
+        name = f"Person{len(people)}"
+        if mother is None:
+            weights = [PROBS["gene"][g] for g in range(3)]
+        else:
+            weights = inheritance_table()[genes[mother], genes[father]]
+        genes[name] = random.choices(range(3), weights)[0]
+        trait = random.random() < PROBS["trait"][genes[name]][True]
+        people[name] = {
+            "name": name,
+            "mother": mother,
+            "father": father,
+            "trait": trait if random.random() < evidence else None
+        }
+        return name
+
+    # Spread the people roughly evenly over the generations
+    founders = max(2, size // (generations + 1))
+    generation = [add() for _ in range(min(founders, size))]
+    while len(people) < size:
+        random.shuffle(generation)
+        children = []
+        for i in range(0, len(generation), 2):
+            if len(people) >= size:
+                break
+            mother = generation[i]
+            if i + 1 < len(generation) and random.random() < 0.5:
+                father = generation[i + 1]
+            else:
+                father = add()
+            for _ in range(random.randint(1, 3)):
+                if len(people) >= size:
+                    break
+                children.append(add(mother, father))
+        generation = children
+    return people
+
+
+def save_data(people, filename):
+    """
+    Write `people` to a CSV file that `heredity.load_data` can read.
+    """
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "mother", "father", "trait"])
+        for person in people.values():
+            trait = person["trait"]
+            writer.writerow([
+                person["name"],
+                person["mother"] or "",
+                person["father"] or "",
+                "" if trait is None else int(trait)
+            ])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import csv
+import functools
 import itertools
 import sys
 
@@ -44,6 +45,23 @@ def main():
         sys.exit("Usage: python heredity.py data.csv")
     people = load_data(sys.argv[1])
 
+    probabilities = compute_probabilities(people)
+
+    # Print results
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
+
+
+def compute_probabilities(people):
+    """
+    Return the exact gene and trait distribution of every person in
+    `people`, by summing joint probabilities over every assignment.
+    """
     # Keep track of gene and trait probabilities for each person
     probabilities = {
         person: {
@@ -83,15 +101,7 @@ def main():
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
-
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+    return probabilities
 
 
 def load_data(filename):
@@ -143,37 +153,60 @@ def joint_probability(people, one_gene, two_genes, have_trait):
     for name, person in people.items():
         genes = gene_count(name, one_gene, two_genes)
         has_trait = name in have_trait
-        gene_prob = 0
         trait_prob = PROBS['trait'][genes][has_trait]
 
         # Assuming either 0 or 2 parents
         if not person['mother'] or not person['father']:
             gene_prob = PROBS['gene'][genes]
-        
         else:
-            # Probabilty of getting that gene from each parent
-            par_prob = {}
-
-            for parent in ['mother', 'father']:
-                par_genes = gene_count(person[parent], one_gene, two_genes)
-                if not par_genes:
-                    par_prob[parent] = PROBS['mutation']
-                elif par_genes == 1:
-                    par_prob[parent] = 0.5
-                else: # Parent has 2 copies
-                    par_prob[parent] = 1 - PROBS['mutation']
-
-            if not genes: # Get the gene from none of the parents
-                gene_prob = (1 - par_prob['mother']) * (1 - par_prob['father'])
-            elif genes == 1: # From one of them
-                gene_prob = par_prob['mother'] * (1 - par_prob['father']) + \
-                    (1 - par_prob['mother']) * par_prob['father']
-            else: # From both of them
-                gene_prob = par_prob['mother'] * par_prob['father']
-        
+            gene_prob = inheritance_table()[
+                gene_count(person['mother'], one_gene, two_genes),
+                gene_count(person['father'], one_gene, two_genes)
+            ][genes]
+
         joint_prob *= gene_prob * trait_prob
     return joint_prob
 
+def inheritance_probability(genes, mother_genes, father_genes):
+    """
+    Return the probability that a child has `genes` copies of the gene,
+    given how many copies its mother and father have.
+    """
+    # Probabilty of getting that gene from each parent
+    par_prob = {}
+    for parent, par_genes in [('mother', mother_genes),
+                              ('father', father_genes)]:
+        if not par_genes:
+            par_prob[parent] = PROBS['mutation']
+        elif par_genes == 1:
+            par_prob[parent] = 0.5
+        else: # Parent has 2 copies
+            par_prob[parent] = 1 - PROBS['mutation']
+
+    if not genes: # Get the gene from none of the parents
+        return (1 - par_prob['mother']) * (1 - par_prob['father'])
+    elif genes == 1: # From one of them
+        return par_prob['mother'] * (1 - par_prob['father']) + \
+            (1 - par_prob['mother']) * par_prob['father']
+    else: # From both of them
+        return par_prob['mother'] * par_prob['father']
+
+@functools.lru_cache(maxsize=None)
+def inheritance_table():
+    """
+    Return a dictionary mapping `(mother_genes, father_genes)` to a tuple
+    of the probabilities that their child has 0, 1 or 2 copies of the gene.
+    Computed from `PROBS` once per process.
+    """
+    return {
+        (mother, father): tuple(
+            inheritance_probability(genes, mother, father)
+            for genes in range(3)
+        )
+        for mother in range(3)
+        for father in range(3)
+    }
+
 def gene_count(name, one_gene, two_genes):
     return 1 if name in one_gene else (2 if name in two_genes else 0)
 
@@ -0,0 +1,262 @@
+import heapq
+import itertools
+import sys
+import time
+
+from heredity import PROBS, inheritance_table, load_data
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python query.py data.csv")
+    people = load_data(sys.argv[1])
+
+    start = time.perf_counter()
+    query = PedigreeQuery(people)
+    query.marginals()
+    print(f"Compiled and solved in {time.perf_counter() - start:.4f}s")
+
+    # Toggle every person's trait in turn to show incremental updates
+    for name in people:
+        trait = people[name]["trait"]
+        flipped = True if trait is None else not trait
+        start = time.perf_counter()
+        query.set_trait(name, flipped)
+        query.marginals()
+        elapsed = time.perf_counter() - start
+        query.set_trait(name, trait)
+        print(f"  {name} trait -> {flipped}: {elapsed * 1000:.2f}ms")
+
+
+class Factor():
+    """
+    Table over the gene counts of some people.
+    `names` is a tuple of names and `values` a flat list indexed by
+    the mixed-radix number whose k-th digit (base 3) is the gene count
+    of `names[k]`.
+    """
+
+    def __init__(self, names, values):
+        self.names = tuple(names)
+        self.values = values
+
+    @classmethod
+    def product(cls, factors, names, keep):
+        """
+        Multiply `factors` over the scope `names` and sum out everything
+        not in `keep`, in one pass over the joint assignments.
+        """
+        position = {name: k for k, name in enumerate(names)}
+        strides = [
+            [(position[name], 3 ** k) for k, name in enumerate(f.names)]
+            for f in factors
+        ]
+        keep = tuple(keep)
+        keep_strides = [(position[name], 3 ** k) for k, name in enumerate(keep)]
+
+        values = [0] * (3 ** len(keep))
+        for assignment in itertools.product(range(3), repeat=len(names)):
+            p = 1
+            for f, stride in zip(factors, strides):
+                p *= f.values[sum(assignment[i] * s for i, s in stride)]
+                if not p:
+                    break
+            if p:
+                values[sum(assignment[i] * s for i, s in keep_strides)] += p
+        return cls(keep, values)
+
+
+class PedigreeQuery():
+    """
+    Exact gene and trait distributions for a pedigree, compiled once into
+    a junction tree so that evidence can be changed cheaply.
+
+    Every clique caches its potential and every tree edge caches the
+    message in each direction. Changing one person's trait only
+    invalidates the messages pointing away from that person's clique;
+    everything else is reused on the next query.
+    """
+
+    def __init__(self, people):
+        self.people = people
+        self.traits = {name: people[name]["trait"] for name in people}
+        self.compile()
+
+    def compile(self):
+        """
+        Build the junction tree by eliminating people from the moral graph
+        with the min-fill heuristic, and attach each family's inheritance
+        factor to the clique that eliminated its first member.
+        """
+        people = self.people
+
+        # Moral graph: everyone is linked to their parents, and parents
+        # are linked to each other
+        graph = {name: set() for name in people}
+        for name, person in people.items():
+            if person["mother"] and person["father"]:
+                family = {name, person["mother"], person["father"]}
+                for a in family:
+                    graph[a] |= family - {a}
+
+        def fill(name):
+            neighbors = list(graph[name])
+            return sum(
+                1 for a, b in itertools.combinations(neighbors, 2)
+                if b not in graph[a]
+            )
+
+        heap = [(fill(name), len(graph[name]), name) for name in people]
+        heapq.heapify(heap)
+        eliminated = {}
+        self.cliques = []
+        while heap:
+            score, _, name = heapq.heappop(heap)
+            if name in eliminated:
+                continue
+            if score != fill(name):
+                heapq.heappush(heap, (fill(name), len(graph[name]), name))
+                continue
+            neighbors = graph[name]
+            for a in neighbors:
+                graph[a] |= neighbors - {a}
+                graph[a].discard(name)
+            eliminated[name] = len(self.cliques)
+            self.cliques.append((name,) + tuple(sorted(neighbors)))
+            for a in neighbors:
+                heapq.heappush(heap, (fill(a), len(graph[a]), a))
+            del graph[name]
+
+        # Each clique hangs off the clique of its earliest-eliminated
+        # remaining member, which gives the running intersection property
+        self.neighbors = [[] for _ in self.cliques]
+        for index, clique in enumerate(self.cliques):
+            if len(clique) > 1:
+                parent = min(eliminated[name] for name in clique[1:])
+                self.neighbors[index].append(parent)
+                self.neighbors[parent].append(index)
+        self.home = eliminated
+
+        # Inheritance factors never change, so multiply them in now
+        static = [[] for _ in self.cliques]
+        table = inheritance_table()
+        for name, person in people.items():
+            if person["mother"] and person["father"]:
+                names = (name, person["mother"], person["father"])
+                values = [0] * 27
+                for g, m, f in itertools.product(range(3), repeat=3):
+                    values[g + 3 * m + 9 * f] = table[m, f][g]
+            else:
+                names = (name,)
+                values = [PROBS["gene"][g] for g in range(3)]
+            clique = min(eliminated[n] for n in names)
+            static[clique].append(Factor(names, values))
+        self.static = [
+            Factor.product(factors, clique, clique)
+            for factors, clique in zip(static, self.cliques)
+        ]
+
+        self.potentials = {}
+        self.messages = {}
+
+    def set_trait(self, name, trait):
+        """
+        Set whether `name` is known to have the trait (`True` or `False`),
+        or `None` to forget it, invalidating only the affected factors.
+        """
+        if self.traits[name] == trait:
+            return
+        self.traits[name] = trait
+        home = self.home[name]
+        self.potentials.pop(home, None)
+
+        # Messages flowing out of the home clique depend on its evidence
+        stack = [(home, None)]
+        while stack:
+            clique, previous = stack.pop()
+            for neighbor in self.neighbors[clique]:
+                if neighbor != previous:
+                    self.messages.pop((clique, neighbor), None)
+                    stack.append((neighbor, clique))
+
+    def potential(self, clique):
+        """
+        Return the static potential of `clique` times the trait evidence
+        of the people eliminated there.
+        """
+        if clique not in self.potentials:
+            name = self.cliques[clique][0]
+            trait = self.traits[name]
+            factor = self.static[clique]
+            if trait is not None:
+                evidence = Factor(
+                    (name,), [PROBS["trait"][g][trait] for g in range(3)]
+                )
+                factor = Factor.product(
+                    [factor, evidence], factor.names, factor.names
+                )
+            self.potentials[clique] = factor
+        return self.potentials[clique]
+
+    def message(self, source, target):
+        """
+        Return the message from clique `source` to clique `target`,
+        computing (iteratively) any missing messages it depends on.
+        """
+        stack = [(source, target)]
+        while stack:
+            u, v = stack[-1]
+            if (u, v) in self.messages:
+                stack.pop()
+                continue
+            missing = [
+                (w, u) for w in self.neighbors[u]
+                if w != v and (w, u) not in self.messages
+            ]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            separator = [n for n in self.cliques[u] if n in self.cliques[v]]
+            self.messages[u, v] = self.belief(u, exclude=v, keep=separator)
+        return self.messages[source, target]
+
+    def belief(self, clique, exclude=None, keep=None):
+        """
+        Multiply the potential of `clique` with its incoming messages
+        (except the one from `exclude`) and sum out to `keep`.
+        """
+        factors = [self.potential(clique)] + [
+            self.message(neighbor, clique)
+            for neighbor in self.neighbors[clique]
+            if neighbor != exclude
+        ]
+        names = self.cliques[clique]
+        return Factor.product(factors, names, names if keep is None else keep)
+
+    def marginals(self, names=None):
+        """
+        Return gene and trait distributions for `names` (everyone by
+        default), in the same shape as `heredity.compute_probabilities`.
+        """
+        probabilities = {}
+        for name in self.people if names is None else names:
+            genes = self.belief(self.home[name], keep=(name,)).values
+            total = sum(genes)
+            genes = [p / total for p in genes]
+            trait = self.traits[name]
+            if trait is None:
+                has_trait = sum(
+                    genes[g] * PROBS["trait"][g][True] for g in range(3)
+                )
+            else:
+                has_trait = 1 if trait else 0
+            probabilities[name] = {
+                "gene": {2: genes[2], 1: genes[1], 0: genes[0]},
+                "trait": {True: has_trait, False: 1 - has_trait}
+            }
+        return probabilities
+
+
+if __name__ == "__main__":
+    main()
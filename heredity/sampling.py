@@ -0,0 +1,287 @@
+import math
+import random
+import sys
+
+from heredity import PROBS, inheritance_table, load_data
+
+SAMPLES = 10000
+REPORT_EVERY = 1000
+BURN_IN = 100
+BATCH_SIZE = 50
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python sampling.py data.csv [lw|gibbs] [samples]")
+    people = load_data(sys.argv[1])
+    engine = sys.argv[2] if len(sys.argv) >= 3 else "lw"
+    samples = int(sys.argv[3]) if len(sys.argv) == 4 else SAMPLES
+    if samples < 1:
+        sys.exit("Number of samples must be positive")
+    if engine == "lw":
+        estimates = likelihood_weighting(people, samples)
+    elif engine == "gibbs":
+        estimates = gibbs_sampling(people, samples)
+    else:
+        sys.exit(f"Unknown engine {engine}, expected lw or gibbs")
+
+    # Show estimates as they improve, then the final ones in full
+    for n, probabilities, errors in estimates:
+        worst = max(
+            errors[person][field][value]
+            for person in errors
+            for field in errors[person]
+            for value in errors[person][field]
+        )
+        print(f"{n} samples, largest standard error {worst:.4f}")
+
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                e = errors[person][field][value]
+                print(f"    {value}: {p:.4f} ± {e:.4f}")
+
+
+def topological_order(people):
+    """
+    Return a list of the names in `people`, ordered so that
+    every person comes after both of their parents.
+    """
+    order = []
+    visited = set()
+    for name in people:
+        stack = [(name, False)]
+        while stack:
+            person, expanded = stack.pop()
+            if expanded:
+                order.append(person)
+                continue
+            if person in visited:
+                continue
+            visited.add(person)
+            stack.append((person, True))
+            for parent in ["mother", "father"]:
+                if people[person][parent] and \
+                        people[person][parent] not in visited:
+                    stack.append((people[person][parent], False))
+    return order
+
+
+def children(people):
+    """
+    Return a dictionary mapping each name to a list of their children.
+    """
+    result = {name: [] for name in people}
+    for name, person in people.items():
+        if person["mother"] and person["father"]:
+            result[person["mother"]].append(name)
+            if person["father"] != person["mother"]:
+                result[person["father"]].append(name)
+    return result
+
+
+def gene_distribution(people, name, genes):
+    """
+    Return the distribution over gene counts for `name`,
+    given the gene counts `genes` already chosen for their parents.
+    """
+    person = people[name]
+    if not person["mother"] or not person["father"]:
+        return [PROBS["gene"][g] for g in range(3)]
+    return list(
+        inheritance_table()[genes[person["mother"]], genes[person["father"]]]
+    )
+
+
+def choose(distribution):
+    """
+    Sample an index from an unnormalized list of weights.
+    """
+    r = random.random() * sum(distribution)
+    for value, weight in enumerate(distribution):
+        r -= weight
+        if r < 0:
+            return value
+    return len(distribution) - 1
+
+
+def likelihood_weighting(people, samples=SAMPLES, report_every=REPORT_EVERY):
+    """
+    Estimate gene and trait distributions with likelihood weighting.
+
+    Genes are sampled from their parents in topological order, and
+    traits are sampled unless known, in which case the sample is weighted
+    by the probability of the known trait.
+
+    Yields `(n, probabilities, errors)` every `report_every` samples and
+    once more at the end, where `probabilities` has the same shape as in
+    `heredity.main` and `errors` holds the standard error of each entry.
+    """
+    order = topological_order(people)
+    values = {"gene": [2, 1, 0], "trait": [True, False]}
+
+    # Running sums of w, w^2, and w * x, w^2 * x for every indicator x
+    total = total_sq = 0
+    sums = {
+        name: {field: {v: [0, 0] for v in values[field]} for field in values}
+        for name in people
+    }
+
+    for n in range(1, samples + 1):
+        genes = {}
+        traits = {}
+        weight = 1
+        for name in order:
+            genes[name] = choose(gene_distribution(people, name, genes))
+            trait = people[name]["trait"]
+            if trait is None:
+                traits[name] = random.random() < \
+                    PROBS["trait"][genes[name]][True]
+            else:
+                traits[name] = trait
+                weight *= PROBS["trait"][genes[name]][trait]
+
+        total += weight
+        total_sq += weight * weight
+        for name in people:
+            for field, value in [("gene", genes[name]),
+                                 ("trait", traits[name])]:
+                acc = sums[name][field][value]
+                acc[0] += weight
+                acc[1] += weight * weight
+
+        if n % report_every == 0 or n == samples:
+            yield n, *weighted_estimates(sums, total, total_sq)
+
+
+def weighted_estimates(sums, total, total_sq):
+    """
+    Turn running weighted sums into estimates and their standard errors,
+    using the delta-method variance of a self-normalized estimator.
+    """
+    probabilities = {}
+    errors = {}
+    for name, fields in sums.items():
+        probabilities[name] = {}
+        errors[name] = {}
+        for field, accs in fields.items():
+            probabilities[name][field] = {}
+            errors[name][field] = {}
+            for value, (w, w_sq) in accs.items():
+                p = w / total if total else 0
+                var = (1 - 2 * p) * w_sq + p * p * total_sq
+                probabilities[name][field][value] = p
+                errors[name][field][value] = (
+                    math.sqrt(max(var, 0)) / total if total else 0
+                )
+    return probabilities, errors
+
+
+def gibbs_sampling(people, samples=SAMPLES, report_every=REPORT_EVERY,
+                   burn_in=BURN_IN, batch_size=BATCH_SIZE):
+    """
+    Estimate gene and trait distributions with Gibbs sampling.
+
+    Each sweep resamples every person's gene count from its distribution
+    given their parents, their own trait and their children, then
+    resamples every unknown trait given the new gene count. The first
+    `burn_in` sweeps are discarded.
+
+    Standard errors use batch means over `batch_size` consecutive sweeps,
+    which accounts for the correlation between neighbouring sweeps.
+
+    Yields `(n, probabilities, errors)` the same way as
+    `likelihood_weighting`, with `n` counting kept sweeps.
+    """
+    order = topological_order(people)
+    kids = children(people)
+    table = inheritance_table()
+    values = {"gene": [2, 1, 0], "trait": [True, False]}
+
+    # Start from a forward sample that agrees with the evidence; every
+    # state has non-zero probability, so the chain is ergodic from there
+    genes = {}
+    traits = {}
+    for name in order:
+        genes[name] = choose(gene_distribution(people, name, genes))
+        trait = people[name]["trait"]
+        traits[name] = trait if trait is not None else \
+            random.random() < PROBS["trait"][genes[name]][True]
+
+    # Per value: count in current batch, sum and sum of squares of
+    # completed batch means
+    stats = {
+        name: {field: {v: [0, 0, 0] for v in values[field]} for field in values}
+        for name in people
+    }
+    batches = 0
+
+    for sweep in range(burn_in + samples):
+        for name in order:
+            weights = gene_distribution(people, name, genes)
+            for g in range(3):
+                genes[name] = g
+                weights[g] *= PROBS["trait"][g][traits[name]]
+                for child in kids[name]:
+                    weights[g] *= table[
+                        genes[people[child]["mother"]],
+                        genes[people[child]["father"]]
+                    ][genes[child]]
+            genes[name] = choose(weights)
+            if people[name]["trait"] is None:
+                traits[name] = random.random() < \
+                    PROBS["trait"][genes[name]][True]
+
+        if sweep < burn_in:
+            continue
+        n = sweep - burn_in + 1
+        for name in people:
+            stats[name]["gene"][genes[name]][0] += 1
+            stats[name]["trait"][traits[name]][0] += 1
+
+        if n % batch_size == 0:
+            batches += 1
+            for fields in stats.values():
+                for accs in fields.values():
+                    for acc in accs.values():
+                        mean = acc[0] / batch_size
+                        acc[0] = 0
+                        acc[1] += mean
+                        acc[2] += mean * mean
+
+        if n % report_every == 0 or n == samples:
+            yield n, *batch_estimates(stats, batches, batch_size, n)
+
+
+def batch_estimates(stats, batches, batch_size, n):
+    """
+    Turn Gibbs batch statistics into estimates and standard errors.
+    Sweeps from an incomplete final batch count towards the estimate
+    but not towards the error. With fewer than two complete batches,
+    fall back to the binomial error, which ignores autocorrelation.
+    """
+    probabilities = {}
+    errors = {}
+    for name, fields in stats.items():
+        probabilities[name] = {}
+        errors[name] = {}
+        for field, accs in fields.items():
+            probabilities[name][field] = {}
+            errors[name][field] = {}
+            for value, (current, total, total_sq) in accs.items():
+                p = (total * batch_size + current) / n
+                probabilities[name][field][value] = p
+                if batches > 1:
+                    var = (total_sq - total * total / batches) / (batches - 1)
+                    errors[name][field][value] = \
+                        math.sqrt(max(var, 0) / batches)
+                else:
+                    errors[name][field][value] = math.sqrt(p * (1 - p) / n)
+    return probabilities, errors
+
+
+if __name__ == "__main__":
+    main()
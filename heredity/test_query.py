@@ -0,0 +1,35 @@
+import os
+
+from heredity import compute_probabilities, load_data
+from query import PedigreeQuery
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+def largest_difference(a, b):
+    return max(
+        abs(a[name][field][value] - b[name][field][value])
+        for name in a
+        for field in a[name]
+        for value in a[name][field]
+    )
+
+
+def test_matches_exact_after_toggling_evidence():
+    for filename in sorted(os.listdir(DATA)):
+        people = load_data(os.path.join(DATA, filename))
+        query = PedigreeQuery(people)
+        assert largest_difference(
+            compute_probabilities(people), query.marginals()
+        ) < 1e-12
+
+        # Toggle each person through every trait value and back, checking
+        # the cached messages against a fresh exact computation each time
+        for name in people:
+            original = people[name]["trait"]
+            for trait in [True, False, None, original]:
+                query.set_trait(name, trait)
+                people[name]["trait"] = trait
+                assert largest_difference(
+                    compute_probabilities(people), query.marginals()
+                ) < 1e-12
@@ -0,0 +1,115 @@
+import random
+import sys
+import time
+import tracemalloc
+
+from generate import knights_puzzle, random_3sat
+from logic import *
+
+SPEAKERS = [2, 3, 4, 6, 8, 10, 12, 16, 25, 50]
+VARIABLES = [5, 10, 15, 20, 25, 50, 100, 150]
+
+# Engines whose work happens in other processes, which tracemalloc does
+# not see, so their peak memory is the parent process's only
+PARENT_ONLY = {"parallel"}
+
+# Largest number of symbols each engine is asked to handle
+LIMITS = {
+    "sat": None,
+    "resolution": None,
+    "exhaustive": 24,
+    "parallel": 24,
+    "truth_table": 26,
+}
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [seed]")
+    random.seed(int(sys.argv[1]) if len(sys.argv) == 2 else 0)
+
+    print(f"{'instance':>14} {'engine':>12} {'seconds':>9} {'nodes':>9} "
+          f"{'peak KiB':>9}  result")
+    for speakers in SPEAKERS:
+        knowledge, symbols = knights_puzzle(speakers)
+        report(f"knights {speakers}", knowledge, symbols[0])
+    for variables in VARIABLES:
+        knowledge, symbols = random_3sat(variables)
+        report(f"3-sat {variables}", knowledge, symbols[0])
+
+
+def report(instance, knowledge, query):
+    """Runs and prints every engine on one instance."""
+    rows = benchmark(knowledge, query)
+    results = {row["result"] for row in rows if row["result"] is not None}
+    for row in rows:
+        result = row["note"] if row["result"] is None else row["result"]
+        if len(results) > 1:
+            result = f"{result} (ENGINES DISAGREE)"
+        if row["engine"] in PARENT_ONLY and row["result"] is not None:
+            result = f"{result} (peak: parent process only)"
+        print(f"{instance:>14} {row['engine']:>12} {row['seconds']:>9.4f} "
+              f"{row['nodes']:>9} {row['peak'] / 1024:>9.1f}  {result}")
+
+
+def benchmark(knowledge, query):
+    """
+    Checks whether `knowledge` entails `query` with every engine that can
+    handle its number of symbols, returning one row per engine with wall
+    time, peak traced memory and the engine's own measure of work done.
+    For engines in `PARENT_ONLY` the memory is the parent process's.
+    """
+    count = len(knowledge.symbol_set() | query.symbol_set())
+    engines = {
+        "sat": lambda stats: model_check(knowledge, query, stats),
+        "resolution": lambda stats: resolution_check(knowledge, query, stats),
+        "exhaustive": lambda stats: model_check_exhaustive(
+            knowledge, query, stats
+        ),
+        "parallel": lambda stats: parallel_model_check(
+            knowledge, query, stats=stats
+        ),
+        "truth_table": lambda stats: truth_table_check(
+            knowledge, query, stats=stats
+        ),
+    }
+    work = {
+        "sat": lambda stats: stats["decisions"] + stats["propagations"],
+        "resolution": lambda stats: stats["resolved"],
+        "exhaustive": lambda stats: stats["nodes"],
+        "parallel": lambda stats: stats["nodes"],
+        "truth_table": lambda stats: stats["blocks"],
+    }
+
+    rows = []
+    for name, engine in engines.items():
+        if LIMITS[name] is not None and count > LIMITS[name]:
+            rows.append({"engine": name, "seconds": 0, "nodes": 0,
+                         "peak": 0, "result": None, "note": "skipped"})
+            continue
+        stats = dict()
+        note = None
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            result = engine(stats)
+        except Exception as e:
+            # The resolution prover gives up past its clause limit
+            result = None
+            note = str(e)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rows.append({
+            "engine": name,
+            "seconds": elapsed,
+            "nodes": work[name](stats) if result is not None else 0,
+            "peak": peak,
+            "result": result,
+            "note": note,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import random
+
+from logic import *
+
+
+def knights_puzzle(speakers, depth=2):
+    """
+    Returns a random knights-and-knaves puzzle as `(knowledge, symbols)`.
+
+    Each of `speakers` people is a knight or a knave, never both, and
+    makes one statement: a random sentence, nested up to `depth` levels,
+    about who is a knight or a knave. Knights' statements are true and
+    knaves' statements are false, as in puzzle.py.
+    """
+    knights = [Symbol(f"{name(k)} is a Knight") for k in range(speakers)]
+    knaves = [Symbol(f"{name(k)} is a Knave") for k in range(speakers)]
+    atoms = knights + knaves
+
+    def statement(level):
+        if level == 0 or random.random() < 0.3:
+            return random.choice(atoms)
+        kind = random.randrange(4)
+        if kind == 0:
+            return Not(statement(level - 1))
+        elif kind == 1:
+            return And(statement(level - 1), statement(level - 1))
+        elif kind == 2:
+            return Or(statement(level - 1), statement(level - 1))
+        return Implication(statement(level - 1), statement(level - 1))
+
+    knowledge = And()
+    for knight, knave in zip(knights, knaves):
+        said = statement(depth)
+        knowledge.add(Or(knight, knave))
+        knowledge.add(Not(And(knight, knave)))
+        knowledge.add(Or(
+            And(knight, said),
+            And(knave, Not(said))
+        ))
+    return knowledge, atoms
+
+
+def name(k):
+    """Returns A, B, ..., Z, AA, AB, ... for k = 0, 1, ..."""
+    letters = ""
+    k += 1
+    while k:
+        k, r = divmod(k - 1, 26)
+        letters = chr(ord("A") + r) + letters
+    return letters
+
+
+def random_3sat(variables, ratio=4.26):
+    """
+    Returns a random 3-SAT instance as `(knowledge, symbols)`, with
+    `ratio` clauses per variable, each over three distinct variables.
+    The default ratio is near the satisfiability threshold, where
+    instances are hardest.
+    """
+    symbols = [Symbol(f"x{k}") for k in range(variables)]
+    knowledge = And(*[
+        Or(*[
+            symbol if random.random() < 0.5 else Not(symbol)
+            for symbol in random.sample(symbols, min(3, variables))
+        ])
+        for _ in range(round(ratio * variables))
+    ])
+    return knowledge, symbols
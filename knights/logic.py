@@ -1,19 +1,117 @@
+import heapq
 import itertools
+import multiprocessing
+import os
+import weakref
+
+from sat import Solver
 
 
 class Sentence():
 
+    # Interned sentences, keyed by class and the ids of their children
+    table = weakref.WeakValueDictionary()
+
+    # Cached on first use, only on interned sentences, which are never
+    # mutated; any other sentence may change, or contain one that does
+    interned = False
+    _hash = None
+    _symbols = None
+    _formula = None
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave some
+        symbols unassigned. Returns True or False if every completion of
+        the model agrees, and None otherwise.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """
+        Returns a frozenset of all symbols in the sentence, cached if
+        the sentence is interned.
+        """
+        return frozenset()
+
+    def cached(self, key, compute):
+        """
+        Returns the value of `compute()`, kept in attribute `key` if the
+        sentence is interned.
+        """
+        value = getattr(self, key)
+        if value is None:
+            value = compute()
+            if self.interned:
+                setattr(self, key, value)
+        return value
+
+    def encode(self, cnf):
+        """Returns a CNF literal equivalent to the logical sentence."""
+        raise Exception("nothing to encode")
+
+    def evaluate_bits(self, columns, mask, cache):
+        """
+        Evaluates the logical sentence in many models at once. `columns`
+        maps each symbol to an int whose k-th bit is its value in model k,
+        and `mask` has a bit set for every model. Results of shared
+        subsentences are kept in `cache`, keyed by id.
+        """
+        raise Exception("nothing to evaluate")
+
+    @classmethod
+    def intern(cls, sentence):
+        """
+        Returns the canonical immutable copy of `sentence`. Structurally
+        equal sentences intern to the same object, so they compare by
+        identity, and their hash, symbols and formula are computed once.
+        """
+        Sentence.validate(sentence)
+        if sentence.interned:
+            return sentence
+        if isinstance(sentence, Symbol):
+            children = ()
+            key = (Symbol, sentence.name)
+        else:
+            children = tuple(
+                Sentence.intern(child) for child in sentence.children()
+            )
+            key = (type(sentence),) + tuple(id(child) for child in children)
+        interned = Sentence.table.get(key)
+        if interned is None:
+            if isinstance(sentence, Symbol):
+                interned = Symbol(sentence.name)
+            else:
+                interned = type(sentence)(*children)
+            interned.interned = True
+            hash(interned)
+            interned.symbol_set()
+            Sentence.table[key] = interned
+        return interned
+
+    def children(self):
+        """Returns the immediate subsentences."""
+        return ()
+
+    def __getstate__(self):
+        # Hashes of strings differ between processes, so caches are not
+        # pickled, and the copy is an ordinary (not interned) sentence
+        state = self.__dict__.copy()
+        for key in ["_hash", "_symbols", "_formula", "interned"]:
+            state.pop(key, None)
+        return state
 
     @classmethod
     def validate(cls, sentence):
@@ -51,7 +149,9 @@ class Symbol(Sentence):
         return isinstance(other, Symbol) and self.name == other.name
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        def compute():
+            return hash(("symbol", self.name))
+        return self.cached("_hash", compute)
 
     def __repr__(self):
         return self.name
@@ -62,11 +162,26 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
+
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def symbol_set(self):
+        def compute():
+            return frozenset([self.name])
+        return self.cached("_symbols", compute)
+
+    def encode(self, cnf):
+        return cnf.variable(self.name)
+
+    def evaluate_bits(self, columns, mask, cache):
+        try:
+            return columns[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
 
 
 class Not(Sentence):
@@ -75,10 +190,15 @@ class Not(Sentence):
         self.operand = operand
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and hash(self) == hash(other)
+            and self.operand == other.operand
+        )
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        def compute():
+            return hash(("not", hash(self.operand)))
+        return self.cached("_hash", compute)
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -86,11 +206,26 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
+
     def formula(self):
-        return "¬" + Sentence.parenthesize(self.operand.formula())
+        def compute():
+            return "¬" + Sentence.parenthesize(self.operand.formula())
+        return self.cached("_formula", compute)
 
-    def symbols(self):
-        return self.operand.symbols()
+    def symbol_set(self):
+        return self.operand.symbol_set()
+
+    def children(self):
+        return (self.operand,)
+
+    def encode(self, cnf):
+        return -self.operand.encode(cnf)
+
+    def evaluate_bits(self, columns, mask, cache):
+        return mask ^ self.operand.evaluate_bits(columns, mask, cache)
 
 
 class And(Sentence):
@@ -100,12 +235,17 @@ class And(Sentence):
         self.conjuncts = list(conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and hash(self) == hash(other)
+            and self.conjuncts == other.conjuncts
+        )
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        def compute():
+            return hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            )
+        return self.cached("_hash", compute)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -115,19 +255,58 @@ class And(Sentence):
 
     def add(self, conjunct):
         Sentence.validate(conjunct)
+        if self.interned:
+            raise TypeError("interned sentences are immutable")
         self.conjuncts.append(conjunct)
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
-    def formula(self):
-        if len(self.conjuncts) == 1:
-            return self.conjuncts[0].formula()
-        return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
-                           for conjunct in self.conjuncts])
+    def evaluate_partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def formula(self):
+        def compute():
+            if len(self.conjuncts) == 1:
+                return self.conjuncts[0].formula()
+            else:
+                return " ∧ ".join(
+                    [Sentence.parenthesize(conjunct.formula())
+                     for conjunct in self.conjuncts]
+                )
+        return self.cached("_formula", compute)
+
+    def symbol_set(self):
+        def compute():
+            return frozenset().union(
+                *[conjunct.symbol_set() for conjunct in self.conjuncts]
+            )
+        return self.cached("_symbols", compute)
+
+    def children(self):
+        return tuple(self.conjuncts)
+
+    def encode(self, cnf):
+        return cnf.define(self, lambda: cnf.conjunction(
+            [conjunct.encode(cnf) for conjunct in self.conjuncts]
+        ))
+
+    def evaluate_bits(self, columns, mask, cache):
+        if id(self) not in cache:
+            result = mask
+            for conjunct in self.conjuncts:
+                result &= conjunct.evaluate_bits(columns, mask, cache)
+                if not result:
+                    break
+            cache[id(self)] = result
+        return cache[id(self)]
 
 
 class Or(Sentence):
@@ -137,12 +316,17 @@ class Or(Sentence):
         self.disjuncts = list(disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or) and hash(self) == hash(other)
+            and self.disjuncts == other.disjuncts
+        )
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        def compute():
+            return hash(
+                ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+            )
+        return self.cached("_hash", compute)
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -151,14 +335,51 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
-    def formula(self):
-        if len(self.disjuncts) == 1:
-            return self.disjuncts[0].formula()
-        return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
-                            for disjunct in self.disjuncts])
+    def evaluate_partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def formula(self):
+        def compute():
+            if len(self.disjuncts) == 1:
+                return self.disjuncts[0].formula()
+            else:
+                return " ∨  ".join(
+                    [Sentence.parenthesize(disjunct.formula())
+                     for disjunct in self.disjuncts]
+                )
+        return self.cached("_formula", compute)
+
+    def symbol_set(self):
+        def compute():
+            return frozenset().union(
+                *[disjunct.symbol_set() for disjunct in self.disjuncts]
+            )
+        return self.cached("_symbols", compute)
+
+    def children(self):
+        return tuple(self.disjuncts)
+
+    def encode(self, cnf):
+        return cnf.define(self, lambda: -cnf.conjunction(
+            [-disjunct.encode(cnf) for disjunct in self.disjuncts]
+        ))
+
+    def evaluate_bits(self, columns, mask, cache):
+        if id(self) not in cache:
+            result = 0
+            for disjunct in self.disjuncts:
+                result |= disjunct.evaluate_bits(columns, mask, cache)
+                if result == mask:
+                    break
+            cache[id(self)] = result
+        return cache[id(self)]
 
 
 class Implication(Sentence):
@@ -169,12 +390,18 @@ class Implication(Sentence):
         self.consequent = consequent
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication) and hash(self) == hash(other)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        def compute():
+            return hash(
+                ("implies", hash(self.antecedent), hash(self.consequent))
+            )
+        return self.cached("_hash", compute)
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -183,13 +410,45 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
-    def formula(self):
-        antecedent = Sentence.parenthesize(self.antecedent.formula())
-        consequent = Sentence.parenthesize(self.consequent.formula())
-        return f"{antecedent} => {consequent}"
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is True and consequent is False:
+            return False
+        return None
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def formula(self):
+        def compute():
+            antecedent = Sentence.parenthesize(self.antecedent.formula())
+            consequent = Sentence.parenthesize(self.consequent.formula())
+            return f"{antecedent} => {consequent}"
+        return self.cached("_formula", compute)
+
+    def symbol_set(self):
+        def compute():
+            return self.antecedent.symbol_set() | \
+                self.consequent.symbol_set()
+        return self.cached("_symbols", compute)
+
+    def children(self):
+        return (self.antecedent, self.consequent)
+
+    def encode(self, cnf):
+        return cnf.define(self, lambda: -cnf.conjunction(
+            [self.antecedent.encode(cnf), -self.consequent.encode(cnf)]
+        ))
+
+    def evaluate_bits(self, columns, mask, cache):
+        if id(self) not in cache:
+            cache[id(self)] = (
+                (mask ^ self.antecedent.evaluate_bits(columns, mask, cache))
+                | self.consequent.evaluate_bits(columns, mask, cache)
+            )
+        return cache[id(self)]
 
 
 class Biconditional(Sentence):
@@ -200,12 +459,18 @@ class Biconditional(Sentence):
         self.right = right
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional) and hash(self) == hash(other)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        def compute():
+            return hash(
+                ("biconditional", hash(self.left), hash(self.right))
+            )
+        return self.cached("_hash", compute)
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -216,48 +481,418 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
-    def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
-        return f"{left} <=> {right}"
-
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        if right is None:
+            return None
+        return left == right
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
+    def formula(self):
+        def compute():
+            left = Sentence.parenthesize(str(self.left))
+            right = Sentence.parenthesize(str(self.right))
+            return f"{left} <=> {right}"
+        return self.cached("_formula", compute)
+
+    def symbol_set(self):
+        def compute():
+            return self.left.symbol_set() | self.right.symbol_set()
+        return self.cached("_symbols", compute)
+
+    def children(self):
+        return (self.left, self.right)
+
+    def encode(self, cnf):
+        return cnf.define(self, lambda: cnf.equivalence(
+            self.left.encode(cnf), self.right.encode(cnf)
+        ))
+
+    def evaluate_bits(self, columns, mask, cache):
+        if id(self) not in cache:
+            cache[id(self)] = mask ^ (
+                self.left.evaluate_bits(columns, mask, cache)
+                ^ self.right.evaluate_bits(columns, mask, cache)
+            )
+        return cache[id(self)]
+
+
+class CNF():
+    """
+    Tseitin encoding of logical sentences into clauses.
+
+    Every symbol gets a variable, and every compound subsentence gets a
+    fresh variable defined to be equivalent to it, so the clauses grow
+    linearly with the size of the sentence. Structurally equal
+    subsentences share one definition.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = dict()
+        self.names = dict()
+        self.definitions = dict()
+        self.count = 0
+        self.true = None
+
+    def fresh(self):
+        self.count += 1
+        return self.count
+
+    def variable(self, name):
+        """Returns the variable for symbol `name`."""
+        if name not in self.variables:
+            var = self.fresh()
+            self.variables[name] = var
+            self.names[var] = name
+        return self.variables[name]
+
+    def define(self, sentence, encode):
+        """Returns the literal for `sentence`, encoding it only once."""
+        if sentence not in self.definitions:
+            self.definitions[sentence] = encode()
+        return self.definitions[sentence]
+
+    def constant(self):
+        """Returns a literal that is always true."""
+        if self.true is None:
+            self.true = self.fresh()
+            self.clauses.append([self.true])
+        return self.true
+
+    def conjunction(self, literals):
+        """Returns a fresh literal equivalent to the conjunction."""
+        if not literals:
+            return self.constant()
+        if len(literals) == 1:
+            return literals[0]
+        x = self.fresh()
+        for literal in literals:
+            self.clauses.append([-x, literal])
+        self.clauses.append([x] + [-literal for literal in literals])
+        return x
+
+    def equivalence(self, a, b):
+        """Returns a fresh literal equivalent to `a <=> b`."""
+        x = self.fresh()
+        self.clauses.append([-x, -a, b])
+        self.clauses.append([-x, a, -b])
+        self.clauses.append([x, a, b])
+        self.clauses.append([x, -a, -b])
+        return x
+
+    def add(self, sentence):
+        """
+        Asserts that `sentence` is true, splitting top-level conjunctions
+        and writing top-level disjunctions directly as clauses. An
+        interned copy is encoded, so hashes are computed once per node.
+        """
+        sentence = Sentence.intern(sentence)
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append(
+                [disjunct.encode(self) for disjunct in sentence.disjuncts]
+            )
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-sentence.antecedent.encode(self),
+                                 sentence.consequent.encode(self)])
+        elif isinstance(sentence, Not) and isinstance(sentence.operand, Or):
+            for disjunct in sentence.operand.disjuncts:
+                self.add(Not(disjunct))
+        elif isinstance(sentence, Not) and isinstance(sentence.operand, Not):
+            self.add(sentence.operand.operand)
         else:
+            self.clauses.append([sentence.encode(self)])
+
+
+def model_check(knowledge, query, stats=None):
+    """
+    Checks if knowledge base entails query, by showing with a SAT solver
+    that the knowledge base and the negation of the query cannot both hold.
+    If `stats` is a dict, it is filled with the solver's counters.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    solver = Solver(cnf.clauses)
+    entailed = not solver.solve()
+    if stats is not None:
+        stats.update(solver.stats)
+    return entailed
+
+
+def model_check_all(knowledge, queries):
+    """
+    Checks which of `queries` the knowledge base entails, returning a list
+    of booleans in the same order.
+
+    The knowledge base is encoded and solved once. Every model the solver
+    finds rules out all the queries that are false in it, so only queries
+    true in every model seen so far need a solver call of their own.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    literals = [query.encode(cnf) for query in queries]
+    solver = Solver(cnf.clauses)
+    if not solver.solve():
+        return [True for _ in queries]
+
+    def holds(literal, model):
+        value = model.get(abs(literal), False)
+        return value if literal > 0 else not value
+
+    verdicts = [None for _ in queries]
+    for k, literal in enumerate(literals):
+        if not holds(literal, solver.model):
+            verdicts[k] = False
+    for k, literal in enumerate(literals):
+        if verdicts[k] is not None:
+            continue
+        if solver.solve([-literal]):
+            for j in range(k, len(literals)):
+                if verdicts[j] is None and \
+                        not holds(literals[j], solver.model):
+                    verdicts[j] = False
+        else:
+            verdicts[k] = True
+    return verdicts
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+def model_check_exhaustive(knowledge, query, stats=None):
+    """
+    Checks if knowledge base entails query, by enumerating models.
+    If `stats` is a dict, its "nodes" entry counts partial models visited.
+    """
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = sorted(knowledge.symbol_set() | query.symbol_set())
 
     # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    if stats is not None:
+        stats["nodes"] = 0
+    return check_all(knowledge, query, symbols, dict(), stats)
+
+
+def check_all(knowledge, query, symbols, model, stats=None):
+    """
+    Checks if knowledge base entails query in every completion of the
+    partial `model` over the unassigned `symbols`.
+
+    Branches are cut as soon as the partial model decides the outcome:
+    when the knowledge base is already false, or when both it and the
+    query are already true. The one `model` dict is extended and restored
+    in place rather than copied.
+    """
+    if stats is not None:
+        stats["nodes"] += 1
+    kb = knowledge.evaluate_partial(model)
+    if kb is False:
+        return True
+    if kb is True:
+        q = query.evaluate_partial(model)
+        if q is not None:
+            return q
+
+    # Choose the next unused symbol
+    p = next(symbol for symbol in symbols if symbol not in model)
+
+    # Ensure entailment holds with the symbol true and false
+    for value in [True, False]:
+        model[p] = value
+        if not check_all(knowledge, query, symbols, model, stats):
+            del model[p]
+            return False
+    del model[p]
+    return True
+
+
+def resolution_check(knowledge, query, stats=None, limit=100000):
+    """
+    Checks if knowledge base entails query by resolution refutation.
+
+    The knowledge base and the negated query are converted to clauses.
+    Following the set-of-support strategy, every resolution step uses at
+    least one clause descended from the negated query, shortest clauses
+    first. Clauses are indexed by literal so that only clauses with a
+    complementary literal are tried, and subsumed clauses are discarded
+    in both directions. The strategy is only complete for a consistent
+    knowledge base, so the knowledge base is first checked with the SAT
+    solver; an inconsistent one entails every query.
+
+    If `stats` is a dict, it is filled with counts of clauses generated,
+    resolution steps, subsumed clauses and clauses kept. Raises an
+    exception if more than `limit` clauses are generated.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    usable = len(cnf.clauses)
+    if stats is None:
+        stats = dict()
+    stats.update(generated=0, resolved=0, subsumed=0, kept=0)
+    if not Solver(cnf.clauses).solve():
+        return True
+    cnf.add(Not(query))
+
+    clauses = dict()
+    index = dict()
+
+    def subsumed(clause):
+        """Checks if a kept clause is a subset of `clause`."""
+        for literal in clause:
+            for other in index.get(literal, ()):
+                if clauses[other] <= clause:
+                    return True
+        return False
+
+    def keep(clause):
+        # Remove kept clauses that the new clause subsumes
+        literal = min(clause, key=lambda l: len(index.get(l, ())))
+        for other in list(index.get(literal, ())):
+            if clause <= clauses[other]:
+                for l in clauses.pop(other):
+                    index[l].discard(other)
+                stats["subsumed"] += 1
+        key = stats["kept"]
+        clauses[key] = clause
+        for l in clause:
+            index.setdefault(l, set()).add(key)
+        stats["kept"] += 1
+
+    def tautology(clause):
+        return any(-literal in clause for literal in clause)
+
+    support = []
+    for k, clause in enumerate(cnf.clauses):
+        clause = frozenset(clause)
+        if not clause:
+            return True
+        if tautology(clause):
+            continue
+        if k < usable:
+            if not subsumed(clause):
+                keep(clause)
+        else:
+            heapq.heappush(support, (len(clause), k, clause))
+
+    count = len(cnf.clauses)
+    while support:
+        _, _, given = heapq.heappop(support)
+        if subsumed(given):
+            stats["subsumed"] += 1
+            continue
+        keep(given)
+
+        for literal in given:
+            for other in list(index.get(-literal, ())):
+                stats["resolved"] += 1
+                resolvent = (given - {literal}) | (clauses[other] - {-literal})
+                if not resolvent:
+                    return True
+                if tautology(resolvent) or subsumed(resolvent):
+                    continue
+                stats["generated"] += 1
+                if stats["generated"] > limit:
+                    raise Exception("resolution clause limit exceeded")
+                count += 1
+                heapq.heappush(support, (len(resolvent), count, resolvent))
+    return False
+
+
+def parallel_model_check(knowledge, query, split=None, processes=None,
+                         stats=None):
+    """
+    Checks if knowledge base entails query by exhaustive model checking
+    spread over a process pool.
+
+    The first `split` symbols are fixed in each of the 2 ** `split` ways,
+    and each resulting cube of models is checked by `check_all` in a
+    worker. As soon as one cube holds a counter-model, the pool is
+    terminated, stopping the other workers mid-search.
+
+    If `stats` is a dict, its "nodes" entry counts the nodes searched in
+    the cubes whose results came back before the pool stopped.
+    """
+    symbols = sorted(knowledge.symbol_set() | query.symbol_set())
+    processes = processes or os.cpu_count()
+    if split is None:
+        # A few cubes per worker keeps the load balanced
+        split = (4 * processes - 1).bit_length()
+    split = min(split, len(symbols))
+
+    if stats is None:
+        stats = dict()
+    stats["nodes"] = 0
+
+    cubes = itertools.product([True, False], repeat=split)
+    with multiprocessing.Pool(
+        processes, initializer=init_worker,
+        initargs=(knowledge, query, symbols)
+    ) as pool:
+        for holds, nodes in pool.imap_unordered(check_cube, cubes):
+            stats["nodes"] += nodes
+            if not holds:
+                pool.terminate()
+                return False
+    return True
+
+
+# Sentences each worker process checks, set once by `init_worker`
+worker = dict()
+
+
+def init_worker(knowledge, query, symbols):
+    worker["knowledge"] = knowledge
+    worker["query"] = query
+    worker["symbols"] = symbols
+
+
+def check_cube(cube):
+    """
+    Checks entailment in the models whose first symbols are `cube`,
+    returning the result and the number of nodes searched.
+    """
+    model = dict(zip(worker["symbols"], cube))
+    stats = {"nodes": 0}
+    holds = check_all(worker["knowledge"], worker["query"],
+                      worker["symbols"], model, stats)
+    return holds, stats["nodes"]
+
+
+def truth_table_check(knowledge, query, block=20, stats=None):
+    """
+    Checks if knowledge base entails query by evaluating the truth table
+    in blocks of 2 ** `block` models, one bitwise pass over each sentence
+    per block. If `stats` is a dict, its "blocks" entry counts blocks.
+    """
+    symbols = sorted(knowledge.symbol_set() | query.symbol_set())
+    low = symbols[:block]
+    high = symbols[block:]
+    size = 1 << len(low)
+    mask = (1 << size) - 1
+
+    # Column k alternates runs of 2 ** k zeros and ones across the block
+    columns = dict()
+    for k, name in enumerate(low):
+        run = 1 << k
+        column = ((1 << run) - 1) << run
+        period = run << 1
+        while period < size:
+            column |= column << period
+            period <<= 1
+        columns[name] = column
+
+    if stats is not None:
+        stats["blocks"] = 0
+    for models in itertools.product([0, mask], repeat=len(high)):
+        if stats is not None:
+            stats["blocks"] += 1
+        columns.update(zip(high, models))
+        cache = dict()
+        kb = knowledge.evaluate_bits(columns, mask, cache)
+        if kb & (mask ^ query.evaluate_bits(columns, mask, cache)):
+            return False
+    return True
@@ -0,0 +1,277 @@
+import heapq
+
+
+class Solver():
+    """
+    CDCL satisfiability solver over clauses in CNF.
+
+    Variables are positive integers and a literal is a variable or its
+    negation, so a clause is a list of non-zero integers. Propagation uses
+    two watched literals per clause; conflicts are analysed to the first
+    unique implication point, and the learned clause is kept.
+    """
+
+    def __init__(self, clauses=()):
+        self.clauses = []
+        self.watches = {}
+        self.values = {}
+        self.levels = {}
+        self.reasons = {}
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.activity = {}
+        self.increment = 1.0
+        self.heap = []
+        self.phase = {}
+        self.inconsistent = False
+        self.model = None
+        self.stats = {"decisions": 0, "propagations": 0, "conflicts": 0,
+                      "learned": 0, "restarts": 0}
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def new_variable(self, var):
+        if var not in self.activity:
+            self.activity[var] = 0.0
+            self.watches[var] = []
+            self.watches[-var] = []
+            heapq.heappush(self.heap, (0.0, var))
+
+    def value(self, literal):
+        """Returns True, False, or None if the literal is unassigned."""
+        value = self.values.get(abs(literal))
+        if value is None:
+            return None
+        return value if literal > 0 else not value
+
+    def add_clause(self, clause):
+        """
+        Adds a clause. Must be called between calls to `solve`.
+        Returns False if the clauses are now known to be unsatisfiable.
+        """
+        if self.inconsistent:
+            return False
+        literals = []
+        for literal in clause:
+            self.new_variable(abs(literal))
+            if -literal in literals:
+                return True
+            value = self.value(literal)
+            if value is True and self.levels[abs(literal)] == 0:
+                return True
+            if literal not in literals and not (
+                value is False and self.levels[abs(literal)] == 0
+            ):
+                literals.append(literal)
+
+        if not literals:
+            self.inconsistent = True
+            return False
+        if len(literals) == 1:
+            if self.value(literals[0]) is None:
+                self.assign(literals[0], None)
+            if self.propagate() is not None:
+                self.inconsistent = True
+                return False
+            return True
+        self.attach(literals)
+        return True
+
+    def attach(self, literals):
+        self.clauses.append(literals)
+        self.watches[literals[0]].append(literals)
+        self.watches[literals[1]].append(literals)
+
+    def assign(self, literal, reason):
+        var = abs(literal)
+        self.values[var] = literal > 0
+        self.levels[var] = len(self.trail_limits)
+        self.reasons[var] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Propagates all pending assignments on the trail.
+        Returns a conflicting clause, or None.
+        """
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            self.stats["propagations"] += 1
+            watching = self.watches[false_literal]
+            kept = []
+            conflict = None
+            for index, clause in enumerate(watching):
+                if conflict is not None:
+                    kept.extend(watching[index:])
+                    break
+
+                # Keep the false literal in the second watched position
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) is True:
+                    kept.append(clause)
+                    continue
+
+                # Look for a new literal to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.value(clause[0]) is False:
+                        conflict = clause
+                    else:
+                        self.assign(clause[0], clause)
+            self.watches[false_literal] = kept
+            if conflict is not None:
+                return conflict
+        return None
+
+    def analyze(self, conflict):
+        """
+        Derives a learned clause from a conflict, returning the clause
+        (asserting literal first) and the level to backjump to.
+        """
+        level = len(self.trail_limits)
+        seen = set()
+        learned = [None]
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for other in clause:
+                if other == literal:
+                    continue
+                var = abs(other)
+                if var in seen or self.levels[var] == 0:
+                    continue
+                seen.add(var)
+                self.bump(var)
+                if self.levels[var] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # Walk back to the next marked literal on the trail
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+
+        learned[0] = -literal
+        self.increment *= 1.05
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal from the highest remaining level second
+        best = max(range(1, len(learned)),
+                   key=lambda k: self.levels[abs(learned[k])])
+        learned[1], learned[best] = learned[best], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, var):
+        self.activity[var] += self.increment
+        if self.activity[var] > 1e100:
+            for v in self.activity:
+                self.activity[v] *= 1e-100
+            self.increment *= 1e-100
+            self.heap = [(-a, v) for v, a in self.activity.items()]
+            heapq.heapify(self.heap)
+        else:
+            heapq.heappush(self.heap, (-self.activity[var], var))
+
+    def backjump(self, level):
+        if len(self.trail_limits) <= level:
+            return
+        limit = self.trail_limits[level]
+        for literal in self.trail[limit:]:
+            var = abs(literal)
+            self.phase[var] = self.values.pop(var)
+            del self.levels[var]
+            del self.reasons[var]
+            heapq.heappush(self.heap, (-self.activity[var], var))
+        del self.trail[limit:]
+        del self.trail_limits[level:]
+        self.head = limit
+
+    def decide(self):
+        """Returns the most active unassigned variable, or None."""
+        while self.heap:
+            _, var = heapq.heappop(self.heap)
+            if var not in self.values:
+                return var
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Searches for an assignment satisfying every clause and all the
+        `assumptions` (literals). Returns True and fills `self.model`
+        (variable -> bool) if one exists, False otherwise. Clauses learned
+        under assumptions stay valid for later calls.
+        """
+        self.model = None
+        if self.inconsistent:
+            return False
+        for var in [abs(literal) for literal in assumptions]:
+            self.new_variable(var)
+        if self.propagate() is not None:
+            self.inconsistent = True
+            return False
+
+        restart_limit = 100
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.stats["conflicts"] += 1
+                conflicts += 1
+                if not self.trail_limits:
+                    self.inconsistent = True
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backjump(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.attach(learned)
+                    self.assign(learned[0], learned)
+                self.stats["learned"] += 1
+                continue
+
+            if conflicts >= restart_limit:
+                self.stats["restarts"] += 1
+                conflicts = 0
+                restart_limit = int(restart_limit * 1.5)
+                self.backjump(0)
+                continue
+
+            # Assumptions are decided first, one level each
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value is False:
+                    self.backjump(0)
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if value is None:
+                    self.assign(literal, None)
+                continue
+
+            var = self.decide()
+            if var is None:
+                self.model = dict(self.values)
+                self.backjump(0)
+                return True
+            self.stats["decisions"] += 1
+            self.trail_limits.append(len(self.trail))
+            self.assign(var if self.phase.get(var, False) else -var, None)
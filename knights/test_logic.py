@@ -0,0 +1,135 @@
+import itertools
+import random
+
+from logic import *
+from sat import Solver
+
+SYMBOLS = [Symbol(name) for name in "ABCDE"]
+
+
+def random_sentence(depth):
+    if depth == 0 or random.random() < 0.3:
+        symbol = random.choice(SYMBOLS)
+        return Not(symbol) if random.random() < 0.3 else symbol
+    kind = random.randrange(5)
+    if kind == 0:
+        return Not(random_sentence(depth - 1))
+    elif kind == 1:
+        return And(*[random_sentence(depth - 1)
+                     for _ in range(random.randint(1, 3))])
+    elif kind == 2:
+        return Or(*[random_sentence(depth - 1)
+                    for _ in range(random.randint(1, 3))])
+    elif kind == 3:
+        return Implication(random_sentence(depth - 1),
+                           random_sentence(depth - 1))
+    return Biconditional(random_sentence(depth - 1),
+                         random_sentence(depth - 1))
+
+
+def test_solver_matches_brute_force():
+    random.seed(0)
+    for _ in range(500):
+        n = random.randint(1, 6)
+        clauses = [
+            [random.choice([-1, 1]) * random.randint(1, n)
+             for _ in range(random.randint(1, 3))]
+            for _ in range(random.randint(0, 20))
+        ]
+        expected = any(
+            all(any(bits[abs(l) - 1] == (l > 0) for l in clause)
+                for clause in clauses)
+            for bits in itertools.product([False, True], repeat=n)
+        )
+        assert Solver(clauses).solve() == expected
+
+
+def test_model_check_matches_enumeration():
+    random.seed(1)
+    for _ in range(500):
+        knowledge = random_sentence(3)
+        query = random_sentence(2)
+        assert model_check(knowledge, query) == \
+            model_check_exhaustive(knowledge, query)
+
+
+def test_truth_table_check_matches_enumeration():
+    random.seed(2)
+    for _ in range(500):
+        knowledge = random_sentence(3)
+        query = random_sentence(2)
+        expected = model_check_exhaustive(knowledge, query)
+        assert truth_table_check(knowledge, query) == expected
+        assert truth_table_check(knowledge, query, block=2) == expected
+
+
+def test_intern_shares_equal_sentences():
+    random.seed(3)
+    for _ in range(200):
+        sentence = random_sentence(3)
+        interned = Sentence.intern(sentence)
+        assert interned == sentence
+        assert hash(interned) == hash(sentence)
+        assert interned.formula() == sentence.formula()
+        assert interned.symbols() == sentence.symbols()
+        assert Sentence.intern(random_copy(sentence)) is interned
+
+
+def random_copy(sentence):
+    if isinstance(sentence, Symbol):
+        return Symbol(sentence.name)
+    return type(sentence)(*[random_copy(child)
+                            for child in sentence.children()])
+
+
+def test_model_check_all_matches_model_check():
+    random.seed(4)
+    queries = SYMBOLS + [Not(symbol) for symbol in SYMBOLS]
+    for _ in range(300):
+        knowledge = random_sentence(3)
+        assert model_check_all(knowledge, queries) == [
+            model_check_exhaustive(knowledge, query) for query in queries
+        ]
+
+
+def test_evaluate_partial_agrees_with_completions():
+    random.seed(5)
+    names = [symbol.name for symbol in SYMBOLS]
+    for _ in range(300):
+        sentence = random_sentence(3)
+        partial = {name: random.choice([True, False])
+                   for name in random.sample(names, random.randint(0, 5))}
+        free = [name for name in names if name not in partial]
+        values = {
+            sentence.evaluate({**partial, **dict(zip(free, bits))})
+            for bits in itertools.product([True, False], repeat=len(free))
+        }
+        value = sentence.evaluate_partial(partial)
+        if value is not None:
+            assert values == {value}
+        elif not free:
+            assert False, "complete model must be decided"
+
+
+def test_parallel_model_check_matches_enumeration():
+    random.seed(6)
+    for _ in range(20):
+        knowledge = random_sentence(3)
+        query = random_sentence(2)
+        assert parallel_model_check(knowledge, query, processes=2) == \
+            model_check_exhaustive(knowledge, query)
+
+
+def test_resolution_check_matches_enumeration():
+    random.seed(7)
+    for _ in range(300):
+        knowledge = random_sentence(3)
+        query = random_sentence(2)
+        assert resolution_check(knowledge, query) == \
+            model_check_exhaustive(knowledge, query)
+
+
+def test_resolution_check_inconsistent_knowledge():
+    A, B = Symbol("A"), Symbol("B")
+    assert resolution_check(And(A, Not(A)), B)
+    assert resolution_check(And(A, Not(A)), Not(B))
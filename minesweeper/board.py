@@ -0,0 +1,171 @@
+import numpy as np
+
+from minesweeper import Minesweeper
+
+# Offsets of the eight neighbors of a cell
+NEIGHBORS = [(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)
+             if (di, dj) != (0, 0)]
+
+
+class ArrayMinesweeper(Minesweeper):
+    """
+    Minesweeper game representation backed by NumPy arrays, with the
+    same interface as `Minesweeper`.
+
+    Mines are placed by sampling cells without replacement, and the
+    number of nearby mines is precomputed for every cell at once, so
+    building and querying very large boards is fast.
+    """
+
+    def __init__(self, height=8, width=8, mines=8, seed=None):
+
+        # Set initial width, height, and number of mines
+        self.height = height
+        self.width = width
+        rng = np.random.default_rng(seed)
+
+        # Add mines randomly, without replacement
+        self.board = np.zeros((height, width), dtype=bool)
+        positions = rng.choice(height * width, size=mines, replace=False)
+        self.board.flat[positions] = True
+        rows, cols = np.divmod(positions, width)
+        self.mines = set(zip(rows.tolist(), cols.tolist()))
+
+        # Count mines around every cell by summing shifted boards
+        padded = np.pad(self.board, 1).astype(np.uint8)
+        self.counts = np.zeros((height, width), dtype=np.uint8)
+        for di, dj in NEIGHBORS:
+            self.counts += padded[1 + di:1 + di + height,
+                                  1 + dj:1 + dj + width]
+
+        # Cells opened with `reveal`
+        self.revealed = np.zeros((height, width), dtype=bool)
+
+        # Labeled regions of cells without nearby mines, made on the
+        # first click on one by `zero_regions`
+        self.regions = None
+
+        # At first, player has found no mines
+        self.mines_found = set()
+
+    def is_mine(self, cell):
+        i, j = cell
+        return bool(self.board[i, j])
+
+    def nearby_mines(self, cell):
+        """
+        Returns the number of mines that are
+        within one row and column of a given cell,
+        not including the cell itself.
+        """
+        i, j = cell
+        return int(self.counts[i, j])
+
+    def zero_regions(self):
+        """
+        Labels the connected regions of safe cells without nearby mines,
+        once per board. Returns the region of every cell (-1 for cells
+        with nearby mines or mines), along with the flat indices of the
+        cells without nearby mines sorted by region and their sorted
+        regions, so that each region is one slice.
+
+        Each run of such cells along a row starts as its own region. Each
+        round links the larger region of every pair of touching runs in
+        neighboring rows to the smaller one, then replaces every region's
+        link with its link's link until it holds the smallest region it
+        reaches. Pairs already sharing a region are dropped, and the
+        rounds stop once none are left.
+        """
+        if self.regions is not None:
+            return self.regions
+        zero = (self.counts == 0) & ~self.board
+
+        # Number every run, each cell taking the number of its run
+        starts = zero.copy()
+        starts[:, 1:] &= ~zero[:, :-1]
+        run = (np.cumsum(starts) - 1).reshape(zero.shape)
+
+        # Pairs of runs touching between neighboring rows, listed only
+        # where a stretch of touching cells starts, since the cells after
+        # it belong to the same two runs
+        first, second = [], []
+        for dj in [-1, 0, 1]:
+            a = (slice(0, self.height - 1),
+                 slice(max(0, -dj), self.width - max(0, dj)))
+            b = (slice(1, self.height),
+                 slice(max(0, dj), self.width - max(0, -dj)))
+            touching = zero[a] & zero[b]
+            both = touching.copy()
+            both[:, 1:] &= ~touching[:, :-1]
+            first.append(run[a][both])
+            second.append(run[b][both])
+        first, second = np.concatenate(first), np.concatenate(second)
+
+        region = np.arange(int(starts.sum()))
+        while True:
+            low, high = region[first], region[second]
+            differ = low != high
+            if not differ.any():
+                break
+            first, second = first[differ], second[differ]
+            low, high = low[differ], high[differ]
+            np.minimum.at(region, np.maximum(low, high),
+                          np.minimum(low, high))
+            while True:
+                jumped = region[region]
+                if np.array_equal(jumped, region):
+                    break
+                region = jumped
+
+        cells = np.flatnonzero(zero)
+        labels = np.full(self.height * self.width, -1)
+        labels[cells] = region[run.reshape(-1)[cells]]
+        order = np.argsort(labels[cells], kind="stable")
+        self.regions = labels, cells[order], labels[cells][order]
+        return self.regions
+
+    def reveal(self, cell):
+        """
+        Opens a safe `cell` and, if it has no nearby mines, the whole
+        region of cells without nearby mines connected to it together
+        with that region's border, as a player's click would.
+        Returns the newly opened cells in row-major order.
+
+        Regions are labeled once by `zero_regions`, so a click only
+        slices out its region's cells, marks them in a mask covering
+        their bounding box and grows the mask by one cell to add the
+        border.
+        """
+        i, j = cell
+        if self.board[i, j]:
+            raise ValueError(f"{cell} is a mine")
+        if self.revealed[i, j]:
+            # Any region and border it belongs to is already open
+            return []
+        if self.counts[i, j]:
+            self.revealed[i, j] = True
+            return [(i, j)]
+
+        labels, cells, sorted_labels = self.zero_regions()
+        label = labels[i * self.width + j]
+        start, stop = np.searchsorted(sorted_labels, [label, label + 1])
+        rows, cols = np.divmod(cells[start:stop], self.width)
+
+        # Bounding box of the region and its border, and the region
+        # within it padded by one cell on every side
+        top = max(int(rows.min()) - 1, 0)
+        left = max(int(cols.min()) - 1, 0)
+        bottom = min(int(rows.max()) + 2, self.height)
+        right = min(int(cols.max()) + 2, self.width)
+        height, width = bottom - top, right - left
+        region = np.zeros((height + 2, width + 2), dtype=bool)
+        region[rows - top + 1, cols - left + 1] = True
+
+        opened = region[1:height + 1, 1:width + 1].copy()
+        for di, dj in NEIGHBORS:
+            opened |= region[1 + di:1 + di + height, 1 + dj:1 + dj + width]
+        revealed = self.revealed[top:bottom, left:right]
+        opened &= ~revealed
+        revealed |= opened
+        rows, cols = np.nonzero(opened)
+        return list(zip((rows + top).tolist(), (cols + left).tolist()))
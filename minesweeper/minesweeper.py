@@ -1,6 +1,8 @@
 import itertools
 import random
 
+from probability import mine_probabilities
+
 
 class Minesweeper():
     """
@@ -98,6 +100,28 @@ class Sentence():
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __len__(self):
+        return len(self.cells)
+
+    def key(self):
+        """
+        Returns a hashable snapshot of the sentence, which stays the
+        same when the sentence is later marked.
+        """
+        return (frozenset(self.cells), self.count)
+
+    def __lt__(self, other):
+        """
+        Checks if this sentence's cells are a proper subset of `other`'s.
+        """
+        return self.cells < other.cells
+
+    def __sub__(self, other):
+        """
+        Returns the sentence left after removing a subset `other`.
+        """
+        return Sentence(self.cells - other.cells, self.count - other.count)
+
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
@@ -131,20 +155,128 @@ class Sentence():
             self.cells.remove(cell)
 
 
+class BitSentence():
+    """
+    Logical statement about a Minesweeper game, like Sentence,
+    with its cells stored as bits of an integer: cell (i, j)
+    is bit i * width + j. Subset tests, differences and marking
+    are single integer operations. The set of cells is kept for
+    iteration, built from the mask on first use for sentences made
+    with `from_mask`, and kept up to date by marking.
+    """
+
+    def __init__(self, cells, count, width):
+        self.width = width
+        self.mask = 0
+        for i, j in cells:
+            self.mask |= 1 << (i * width + j)
+        self.count = count
+        self._cells = set(cells)
+
+    @classmethod
+    def from_mask(cls, mask, count, width):
+        sentence = cls((), count, width)
+        sentence.mask = mask
+        sentence._cells = None
+        return sentence
+
+    @property
+    def cells(self):
+        """
+        Returns the set of cells in the sentence.
+        """
+        if self._cells is None:
+            self._cells = set()
+            mask = self.mask
+            while mask:
+                low = mask & -mask
+                self._cells.add(divmod(low.bit_length() - 1, self.width))
+                mask ^= low
+        return self._cells
+
+    def __eq__(self, other):
+        return self.mask == other.mask and self.count == other.count
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def key(self):
+        """
+        Returns a hashable snapshot of the sentence, which stays the
+        same when the sentence is later marked.
+        """
+        return (self.mask, self.count)
+
+    def __lt__(self, other):
+        return self.mask != other.mask and self.mask & other.mask == self.mask
+
+    def __sub__(self, other):
+        return BitSentence.from_mask(
+            self.mask & ~other.mask, self.count - other.count, self.width
+        )
+
+    def __str__(self):
+        return f"{self.cells} = {self.count}"
+
+    def known_mines(self):
+        """
+        Returns the set of all cells in the sentence known to be mines.
+        """
+        return set(self.cells) if len(self) == self.count else set()
+
+    def known_safes(self):
+        """
+        Returns the set of all cells in the sentence known to be safe.
+        """
+        return set(self.cells) if self.count == 0 else set()
+
+    def mark_mine(self, cell):
+        """
+        Updates internal knowledge representation given the fact that
+        a cell is known to be a mine.
+        """
+        bit = 1 << (cell[0] * self.width + cell[1])
+        if self.mask & bit:
+            self.mask ^= bit
+            self.count -= 1
+            if self._cells is not None:
+                self._cells.discard(cell)
+
+    def mark_safe(self, cell):
+        """
+        Updates internal knowledge representation given the fact that
+        a cell is known to be safe.
+        """
+        self.mask &= ~(1 << (cell[0] * self.width + cell[1]))
+        if self._cells is not None:
+            self._cells.discard(cell)
+
+
 class MinesweeperAI():
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, bitsets=False, total_mines=None):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Number of mines on the board, if known, for guessing
+        self.total_mines = total_mines
+
+        # Store sentences as integer bitmasks instead of sets of cells
+        self.bitsets = bitsets
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
+        # Cells neither clicked on nor known to be mines, with each
+        # cell's position in the list so it can be removed in O(1)
+        self.unknown = [(i, j) for i in range(height) for j in range(width)]
+        self.positions = {cell: k for k, cell in enumerate(self.unknown)}
+
         # Keep track of cells known to be safe or mines
         self.mines = set()
         self.safes = set()
@@ -152,14 +284,57 @@ class MinesweeperAI():
         # List of sentences about the game known to be true
         self.knowledge = []
 
+        # Maps each cell to the sentences mentioning it, keyed by id
+        self.index = {}
+
+        # Keys of every sentence as added or marked, to skip derived
+        # duplicates
+        self.keys = set()
+
+        # Sentences that are new or changed and still need inference
+        self.pending = {}
+
+        # Number of emptied sentences still in self.knowledge
+        self.emptied = 0
+
+        # Running counts of inference work
+        self.stats = {"comparisons": 0, "derived": 0}
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base, indexes its cells
+        and queues it for inference.
+        """
+        self.knowledge.append(sentence)
+        self.keys.add(sentence.key())
+        for cell in sentence.cells:
+            self.index.setdefault(cell, {})[id(sentence)] = sentence
+        self.pending[id(sentence)] = sentence
+
+    def update_sentences(self, cell, mine):
+        """
+        Removes `cell` from every sentence mentioning it, as a mine or
+        as a safe cell, and queues those sentences again.
+        """
+        for sentence in self.index.pop(cell, {}).values():
+            if mine:
+                sentence.mark_mine(cell)
+            else:
+                sentence.mark_safe(cell)
+            if len(sentence):
+                self.keys.add(sentence.key())
+                self.pending[id(sentence)] = sentence
+            else:
+                self.emptied += 1
+
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.remove_unknown(cell)
+        self.update_sentences(cell, mine=True)
 
     def mark_safe(self, cell):
         """
@@ -167,8 +342,20 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        self.update_sentences(cell, mine=False)
+
+    def remove_unknown(self, cell):
+        """
+        Removes `cell` from the unknown cells by moving the last
+        unknown cell into its place.
+        """
+        position = self.positions.pop(cell, None)
+        if position is None:
+            return
+        last = self.unknown.pop()
+        if last != cell:
+            self.unknown[position] = last
+            self.positions[last] = position
 
     def add_knowledge(self, cell, count):
         """
@@ -186,30 +373,21 @@ class MinesweeperAI():
                if they can be inferred from existing knowledge
         """
         self.moves_made.add(cell)
+        self.remove_unknown(cell)
         self.mark_safe(cell)
 
         cells = []
         for neib in self.nearby_cells(cell):
             if neib in self.mines:
                 count -= 1
-            if neib not in self.safes | self.mines:
+            elif neib not in self.safes:
                 cells.append(neib)
 
         if cells:
-            self.knowledge.append(Sentence(cells, count))
+            self.add_sentence(self.new_sentence(cells, count))
 
         self.cleanup_knowledge()
 
-        # Infer new knowledge using the subset method
-        for s1 in self.knowledge:
-            for s2 in self.knowledge:
-                if s1.cells < s2.cells:
-                    ns = Sentence(s2.cells - s1.cells, s2.count - s1.count)
-                    for mine in ns.known_mines():
-                        self.mark_mine(mine)
-                    for safe in ns.known_safes():
-                        self.mark_safe(safe)
-
     def nearby_cells(self, cell):
         neibs = []
         for move in [(-1,-1),(-1,0),(-1,1),(0,-1),(0,1),(1,-1),(1,0),(1,1)]:
@@ -220,22 +398,71 @@ class MinesweeperAI():
         return neibs
 
     def cleanup_knowledge(self):
-        while True:
-            changes = False
+        """
+        Runs inference on queued sentences until nothing changes.
 
-            for sen in self.knowledge:
-                for mine in sen.known_mines():
-                    self.mark_mine(mine)
-                    changes = True
-                for safe in sen.known_safes():
-                    self.mark_safe(safe)
-                    changes = True
+        A queued sentence either settles its cells as mines or safes,
+        which queues every sentence mentioning them, or is compared with
+        the sentences sharing a cell with it using the subset method,
+        which queues any sentence derived that way.
+        """
+        while self.pending:
+            _, sentence = self.pending.popitem()
+            if not len(sentence):
+                continue
 
-            # Delete empty sentences
-            self.knowledge = list(filter(lambda s: len(s.cells), self.knowledge))
+            mines = sentence.known_mines()
+            safes = sentence.known_safes()
+            for mine in mines:
+                self.mark_mine(mine)
+            for safe in safes:
+                self.mark_safe(safe)
+            if not mines and not safes:
+                self.infer_subsets(sentence)
+
+        # Delete empty sentences once they make up half the knowledge
+        if self.emptied * 2 > len(self.knowledge):
+            self.knowledge = [s for s in self.knowledge if len(s)]
+            self.emptied = 0
+
+    def infer_subsets(self, sentence):
+        """
+        Compares `sentence` with every sentence sharing a cell with it,
+        adding the difference whenever one is a subset of the other.
+        """
+        neighbors = {}
+        for cell in sentence.cells:
+            neighbors.update(self.index.get(cell, {}))
+        neighbors.pop(id(sentence), None)
+        self.stats["comparisons"] += len(neighbors)
+
+        for other in neighbors.values():
+            if other < sentence:
+                self.add_derived(sentence - other)
+            elif sentence < other:
+                self.add_derived(other - sentence)
+
+    def add_derived(self, derived):
+        """
+        Adds an inferred sentence unless an equal one is already known.
+
+        Keys are recorded as sentences are added or marked. A key only
+        goes stale once one of its cells is marked, and derived sentences
+        never hold marked cells, so a derived sentence matching any key
+        matches a sentence still in the knowledge base.
+        """
+        if derived.key() in self.keys:
+            return
+        self.stats["derived"] += 1
+        self.add_sentence(derived)
 
-            if not changes:
-                break
+    def new_sentence(self, cells, count):
+        """
+        Returns a sentence in the representation this AI uses.
+        """
+        if self.bitsets:
+            return BitSentence(cells, count, self.width)
+        return Sentence(cells, count)
 
     def make_safe_move(self):
         """
@@ -257,15 +484,28 @@ class MinesweeperAI():
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        available = []
-        for i in range(self.height):
-            for j in range(self.width):
-                cell = (i, j)
-                if cell not in self.moves_made | self.mines:
-                    available.append(cell)
+        if not self.unknown:
+            return None
+        return self.unknown[random.randrange(len(self.unknown))]
 
-        if not available:
+    def make_guess_move(self):
+        """
+        Returns the move least likely to be a mine, among cells that
+        have not been chosen and are not known to be mines, or None.
+
+        Probabilities are exact given the knowledge base and the total
+        number of mines; without a total, this is a random move.
+        """
+        if self.total_mines is None:
+            return self.make_random_move()
+
+        if not self.unknown:
             return None
-        
-        return available[random.randrange(len(available))]
-    
+
+        probabilities = mine_probabilities(
+            self.knowledge, self.unknown, self.total_mines - len(self.mines)
+        )
+        lowest = min(probabilities.values())
+        best = [cell for cell in self.unknown
+                if probabilities[cell] == lowest]
+        return best[random.randrange(len(best))]
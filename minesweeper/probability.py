@@ -0,0 +1,284 @@
+import math
+import random
+
+# Components with more cells than this, or whose enumeration needs more
+# memoized states than this, are estimated by sampling instead
+EXACT_CELLS = 80
+EXACT_STATES = 200000
+SAMPLES = 1000
+
+
+def mine_probabilities(sentences, unknown, total_mines):
+    """
+    Returns a dictionary mapping every cell in `unknown` to the
+    probability that it is a mine.
+
+    `sentences` are the knowledge base sentences, whose cells must all be
+    unknown, and `total_mines` is how many mines among `unknown` remain.
+    The frontier (cells in some sentence) is split into independent
+    components; each component's consistent mine placements are counted
+    by number of mines, and the components are combined with the number
+    of ways to place the remaining mines in the interior cells.
+    """
+    constraints = [(list(s.cells), s.count) for s in sentences if len(s)]
+    components = split_components(constraints)
+    frontier = set()
+    for cells, _ in components:
+        frontier.update(cells)
+    interior = len(unknown) - len(frontier)
+
+    # Per component: {mines: (ways, per-cell mine counts)}
+    solutions = [count_solutions(cells, cons) for cells, cons in components]
+    if not all(solutions):
+        # Sampling found no consistent placement; fall back to a uniform
+        # guess
+        return {cell: 0.5 for cell in unknown}
+
+    # ways[k][m] is the number of placements with m mines in component k
+    ways = [
+        [solution[m][0] if m in solution else 0
+         for m in range(max(solution) + 1)]
+        for solution in solutions
+    ]
+
+    def placements(frontier_mines):
+        remaining = total_mines - frontier_mines
+        if remaining < 0 or remaining > interior:
+            return 0
+        return math.comb(interior, remaining)
+
+    # Convolutions of every component before and after each one
+    prefix = [[1]]
+    for w in ways:
+        prefix.append(convolve(prefix[-1], w))
+    suffix = [[1]]
+    for w in reversed(ways):
+        suffix.append(convolve(suffix[-1], w))
+    suffix.reverse()
+
+    everything = prefix[-1]
+    total = sum(count * placements(m) for m, count in enumerate(everything))
+    if not total:
+        # Inconsistent knowledge; fall back to a uniform guess
+        return {cell: 0.5 for cell in unknown}
+
+    probabilities = {}
+    for k, ((cells, _), solution) in enumerate(zip(components, solutions)):
+        others = convolve(prefix[k], suffix[k + 1])
+        for m, (_, counts) in solution.items():
+            weight = sum(
+                count * placements(m + rest)
+                for rest, count in enumerate(others)
+            )
+            for cell, count in zip(cells, counts):
+                probabilities[cell] = \
+                    probabilities.get(cell, 0) + count * weight
+
+    for cell in probabilities:
+        probabilities[cell] /= total
+
+    if interior:
+        expected = sum(
+            count * placements(m) * (total_mines - m)
+            for m, count in enumerate(everything)
+        )
+        interior_probability = expected / total / interior
+        for cell in unknown:
+            if cell not in frontier:
+                probabilities[cell] = interior_probability
+    return probabilities
+
+
+def convolve(a, b):
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                result[i + j] += x * y
+    return result
+
+
+def split_components(constraints):
+    """
+    Groups constraints that share cells, returning a list of
+    `(cells, constraints)` pairs where each constraint is
+    `(positions, count)` with positions indexing into `cells`.
+    """
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells, _ in constraints:
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        for cell in cells[1:]:
+            parent[find(cell)] = find(cells[0])
+
+    groups = {}
+    for cells, count in constraints:
+        groups.setdefault(find(cells[0]), []).append((cells, count))
+
+    components = []
+    for group in groups.values():
+
+        # Order cells so that each constraint spans a short stretch,
+        # which keeps the number of memoized states small
+        order = []
+        seen = set()
+        for cells, _ in group:
+            for cell in sorted(cells):
+                if cell not in seen:
+                    seen.add(cell)
+                    order.append(cell)
+        position = {cell: i for i, cell in enumerate(order)}
+        components.append((order, [
+            (sorted(position[cell] for cell in cells), count)
+            for cells, count in group
+        ]))
+    return components
+
+
+class TooManyStates(Exception):
+    pass
+
+
+def count_solutions(cells, constraints):
+    """
+    Returns {mines: (ways, counts)} for one component, where `ways` is the
+    number of consistent mine placements with that many mines and
+    `counts[i]` how many of them put a mine on `cells[i]`.
+    Falls back to `sample_solutions` for components that are too big.
+    """
+    if len(cells) > EXACT_CELLS:
+        return sample_solutions(cells, constraints, SAMPLES)
+    try:
+        return enumerate_solutions(cells, constraints)
+    except TooManyStates:
+        return sample_solutions(cells, constraints, SAMPLES)
+
+
+def constraint_tables(cells, constraints):
+    """
+    Returns, for each position, the constraints containing it and the
+    constraints still open there, plus how many cells each constraint
+    has after each position.
+    """
+    n = len(cells)
+    touching = [[] for _ in range(n)]
+    active = [[] for _ in range(n + 1)]
+    left = []
+    for c, (positions, _) in enumerate(constraints):
+        for i in positions:
+            touching[i].append(c)
+        for i in range(positions[0] + 1, positions[-1] + 1):
+            active[i].append(c)
+        after = [0] * n
+        remaining = len(positions)
+        for i in range(n):
+            if i in positions:
+                remaining -= 1
+            after[i] = remaining
+        left.append(after)
+    return touching, active, left
+
+
+def assign(value, i, remaining, touching, left):
+    """
+    Returns the remaining counts after giving position `i` the value
+    `value`, or None if some constraint can no longer be met.
+    """
+    remaining = list(remaining)
+    for c in touching[i]:
+        remaining[c] -= value
+        if remaining[c] < 0 or remaining[c] > left[c][i]:
+            return None
+    return remaining
+
+
+def enumerate_solutions(cells, constraints):
+    """
+    Counts consistent placements exactly by backtracking over the cells
+    in order. Results are memoized on the position and the remaining
+    counts of the constraints still open there, since constraints not
+    yet started are untouched and finished ones are already satisfied.
+    """
+    n = len(cells)
+    touching, active, left = constraint_tables(cells, constraints)
+    memo = {}
+
+    def solve(i, remaining):
+        if i == n:
+            return {0: (1, ())}
+        key = (i, tuple(remaining[c] for c in active[i]))
+        if key in memo:
+            return memo[key]
+        if len(memo) > EXACT_STATES:
+            raise TooManyStates()
+
+        result = {}
+        for value in [0, 1]:
+            after = assign(value, i, remaining, touching, left)
+            if after is None:
+                continue
+            for m, (ways, counts) in solve(i + 1, after).items():
+                counts = (ways if value else 0,) + counts
+                if m + value in result:
+                    total, previous = result[m + value]
+                    result[m + value] = (
+                        total + ways,
+                        tuple(a + b for a, b in zip(previous, counts))
+                    )
+                else:
+                    result[m + value] = (ways, counts)
+        memo[key] = result
+        return result
+
+    return solve(0, [count for _, count in constraints])
+
+
+def sample_solutions(cells, constraints, samples=SAMPLES):
+    """
+    Estimates the same table as `enumerate_solutions`, up to a constant
+    factor, by sequential importance sampling.
+
+    Each sample walks the cells in order, choosing uniformly among the
+    values that keep every constraint satisfiable, and is weighted by
+    the product of the number of choices it had, the inverse of the
+    chance of walking that path. A consistent placement is then counted
+    with expected weight one however likely its path, so the summed
+    weights are unbiased estimates of the ways and counts. Walks that
+    reach a dead end are discarded, which is the same as giving them
+    weight zero.
+    """
+    n = len(cells)
+    touching, _, left = constraint_tables(cells, constraints)
+    start = [count for _, count in constraints]
+    result = {}
+
+    for _ in range(samples):
+        values = []
+        remaining = start
+        weight = 1
+        for i in range(n):
+            choices = []
+            for value in [0, 1]:
+                after = assign(value, i, remaining, touching, left)
+                if after is not None:
+                    choices.append((value, after))
+            if not choices:
+                break
+            weight *= len(choices)
+            value, remaining = random.choice(choices)
+            values.append(value)
+        if len(values) < n:
+            continue
+
+        m = sum(values)
+        ways, counts = result.get(m, (0, [0] * n))
+        result[m] = (ways + weight,
+                     [a + weight * b for a, b in zip(counts, values)])
+    return result
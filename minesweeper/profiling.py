@@ -0,0 +1,82 @@
+import csv
+import json
+import time
+
+from minesweeper import MinesweeperAI
+
+FIELDS = [
+    "move", "cell", "count", "seconds", "cleanup_seconds",
+    "subset_seconds", "sentences", "comparisons", "derived",
+    "mines", "safes",
+]
+
+
+class ProfiledAI(MinesweeperAI):
+    """
+    MinesweeperAI that records, for every call to `add_knowledge`, how
+    long it took, how much of that was spent in `cleanup_knowledge` and
+    in subset inference, the number of live sentences afterwards, the
+    sentence pairs compared, the sentences derived, and the mines and
+    safe cells newly inferred.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.records = []
+        self.timers = {"cleanup": 0.0, "subsets": 0.0}
+
+    def add_knowledge(self, cell, count):
+        stats = dict(self.stats)
+        mines = len(self.mines)
+        safes = len(self.safes) + (cell not in self.safes)
+        self.timers = {"cleanup": 0.0, "subsets": 0.0}
+
+        start = time.perf_counter()
+        super().add_knowledge(cell, count)
+        elapsed = time.perf_counter() - start
+
+        self.records.append({
+            "move": len(self.records) + 1,
+            "cell": f"{cell[0]},{cell[1]}",
+            "count": count,
+            "seconds": elapsed,
+            "cleanup_seconds": self.timers["cleanup"],
+            "subset_seconds": self.timers["subsets"],
+            "sentences": len(self.knowledge) - self.emptied,
+            "comparisons": self.stats["comparisons"] - stats["comparisons"],
+            "derived": self.stats["derived"] - stats["derived"],
+            "mines": len(self.mines) - mines,
+            "safes": len(self.safes) - safes,
+        })
+
+    def cleanup_knowledge(self):
+        start = time.perf_counter()
+        super().cleanup_knowledge()
+        self.timers["cleanup"] += time.perf_counter() - start
+
+    def infer_subsets(self, sentence):
+        start = time.perf_counter()
+        super().infer_subsets(sentence)
+        self.timers["subsets"] += time.perf_counter() - start
+
+
+def save_profile(records, filename):
+    """
+    Writes per-move records to `filename`, as JSON if it ends in .json
+    and as CSV otherwise. Extra fields, such as the game a move belongs
+    to, are written before the standard ones.
+    """
+    if filename.endswith(".json"):
+        with open(filename, "w") as f:
+            json.dump(records, f, indent=1)
+        return
+
+    extra = []
+    for record in records:
+        for field in record:
+            if field not in FIELDS and field not in extra:
+                extra.append(field)
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=extra + FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
@@ -3,11 +3,19 @@ import sys
 import time
 
 from minesweeper import Minesweeper, MinesweeperAI
+from profiling import ProfiledAI, save_profile
 
 HEIGHT = 8
 WIDTH = 8
 MINES = 8
 
+# Optionally record the AI's per-move profile, saved on quit
+if len(sys.argv) > 2:
+    sys.exit("Usage: python runner.py [profile.csv|profile.json]")
+PROFILE = sys.argv[1] if len(sys.argv) == 2 else None
+Player = ProfiledAI if PROFILE else MinesweeperAI
+records = []
+
 # Colors
 BLACK = (0, 0, 0)
 GRAY = (180, 180, 180)
@@ -39,7 +47,7 @@ mine = pygame.transform.scale(mine, (cell_size, cell_size))
 
 # Create game and AI agent
 game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+ai = Player(height=HEIGHT, width=WIDTH, total_mines=MINES)
 
 # Keep track of revealed cells, flagged cells, and if a mine was hit
 revealed = set()
@@ -54,6 +62,9 @@ while True:
     # Check if game quit
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            if PROFILE:
+                records.extend(ai.records)
+                save_profile(records, PROFILE)
             sys.exit()
 
     screen.fill(BLACK)
@@ -182,12 +193,12 @@ while True:
         if aiButton.collidepoint(mouse) and not lost:
             move = ai.make_safe_move()
             if move is None:
-                move = ai.make_random_move()
+                move = ai.make_guess_move()
                 if move is None:
                     flags = ai.mines.copy()
                     print("No moves left to make.")
                 else:
-                    print("No known safe moves, AI making random move.")
+                    print("No known safe moves, AI making lowest-risk move.")
             else:
                 print("AI making safe move.", move)
             time.sleep(0.2)
@@ -195,7 +206,9 @@ while True:
         # Reset game state
         elif resetButton.collidepoint(mouse):
             game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-            ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+            if PROFILE:
+                records.extend(ai.records)
+            ai = Player(height=HEIGHT, width=WIDTH, total_mines=MINES)
             revealed = set()
             flags = set()
             lost = False
@@ -0,0 +1,136 @@
+import multiprocessing
+import random
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+from profiling import ProfiledAI, save_profile
+
+SIZES = "8x8,16x16,16x30"
+DENSITIES = "0.125,0.156,0.206"
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4, 5, 6]:
+        sys.exit("Usage: python simulate.py games [HxW,...] "
+                 "[density,...] [processes] [profile.csv|profile.json]")
+    games = int(sys.argv[1])
+    if games < 1:
+        sys.exit("Number of games must be positive")
+    sizes = parse_sizes(sys.argv[2] if len(sys.argv) >= 3 else SIZES)
+    densities = [float(d) for d in (
+        sys.argv[3] if len(sys.argv) >= 4 else DENSITIES
+    ).split(",")]
+    processes = int(sys.argv[4]) if len(sys.argv) >= 5 else None
+    profile = sys.argv[5] if len(sys.argv) == 6 else None
+    records = [] if profile else None
+
+    print(f"{'board':>9} {'mines':>6} {'games':>6} {'win %':>6} "
+          f"{'moves/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8}")
+    for height, width in sizes:
+        for density in densities:
+            mines = max(1, round(height * width * density))
+            if mines >= height * width:
+                continue
+            row = simulate(height, width, mines, games, processes, records)
+            print(f"{f'{height}x{width}':>9} {mines:>6} {row['games']:>6} "
+                  f"{100 * row['wins'] / row['games']:>6.1f} "
+                  f"{row['moves_per_second']:>9.0f} "
+                  f"{1000 * row['p50']:>8.3f} {1000 * row['p90']:>8.3f} "
+                  f"{1000 * row['p99']:>8.3f} {1000 * row['max']:>8.3f}")
+    if profile:
+        save_profile(records, profile)
+
+
+def parse_sizes(text):
+    """Parses "8x8,16x30" into [(8, 8), (16, 30)]."""
+    sizes = []
+    for size in text.split(","):
+        height, width = size.lower().split("x")
+        sizes.append((int(height), int(width)))
+    return sizes
+
+
+def play_game(job):
+    """
+    Plays one game headlessly and returns whether the AI won, how long
+    the AI took on each move (updating its knowledge with the previous
+    move's result and choosing the next move), and the AI's per-move
+    profile if profiling, or None.
+    """
+    height, width, mines, seed, profile = job
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    player = ProfiledAI if profile else MinesweeperAI
+    ai = player(height=height, width=width, total_mines=mines)
+
+    latencies = []
+    revealed = 0
+    move = None
+    while True:
+        start = time.perf_counter()
+        if move is not None:
+            ai.add_knowledge(move, game.nearby_mines(move))
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_guess_move()
+        latencies.append(time.perf_counter() - start)
+
+        if move is None or game.is_mine(move):
+            break
+        revealed += 1
+        if revealed == height * width - mines:
+            break
+
+    won = revealed == height * width - mines
+    if not profile:
+        return won, latencies, None
+    for record in ai.records:
+        record.update({"board": f"{height}x{width}", "mines_total": mines,
+                       "game": seed, "won": won})
+    return won, latencies, ai.records
+
+
+def percentile(values, fraction):
+    """Returns the value at `fraction` of the way through sorted `values`."""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def simulate(height, width, mines, games, processes=None, records=None):
+    """
+    Plays `games` games on one board configuration across a process pool
+    and returns the number of wins, AI moves per second of AI time, and
+    percentiles of per-move latency in seconds.
+
+    If `records` is a list, the AI is profiled and every move's record
+    is appended to it.
+    """
+    profile = records is not None
+    jobs = [(height, width, mines, seed, profile) for seed in range(games)]
+    wins = 0
+    latencies = []
+    with multiprocessing.Pool(processes) as pool:
+        for won, moves, profiled in pool.imap_unordered(
+            play_game, jobs, chunksize=8
+        ):
+            wins += won
+            latencies.extend(moves)
+            if profile:
+                records.extend(profiled)
+
+    latencies.sort()
+    return {
+        "games": games,
+        "wins": wins,
+        "moves": len(latencies),
+        "moves_per_second": len(latencies) / sum(latencies),
+        "p50": percentile(latencies, 0.5),
+        "p90": percentile(latencies, 0.9),
+        "p99": percentile(latencies, 0.99),
+        "max": latencies[-1],
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import itertools
+import random
+
+import probability
+from minesweeper import Minesweeper, MinesweeperAI
+from probability import mine_probabilities
+
+
+def random_positions(count, seed):
+    """
+    Yields `(knowledge, unknown, mines)` after a few random moves on small
+    boards, small enough to enumerate every placement of the mines left.
+    """
+    random.seed(seed)
+    for _ in range(count):
+        height, width, mines = 4, 5, 5
+        game = Minesweeper(height, width, mines)
+        ai = MinesweeperAI(height, width, total_mines=mines)
+        for _ in range(random.randint(1, 4)):
+            move = ai.make_safe_move() or ai.make_random_move()
+            if move is None or game.is_mine(move):
+                break
+            ai.add_knowledge(move, game.nearby_mines(move))
+        yield ai.knowledge, list(ai.unknown), mines - len(ai.mines)
+
+
+def brute_force(knowledge, unknown, mines):
+    counts = dict.fromkeys(unknown, 0)
+    total = 0
+    for placement in itertools.combinations(unknown, mines):
+        placement = set(placement)
+        if all(len(placement & set(sentence.cells)) == sentence.count
+               for sentence in knowledge if len(sentence)):
+            total += 1
+            for cell in placement:
+                counts[cell] += 1
+    return {cell: counts[cell] / total for cell in unknown}
+
+
+def test_exact_matches_brute_force():
+    for knowledge, unknown, mines in random_positions(200, 0):
+        expected = brute_force(knowledge, unknown, mines)
+        probabilities = mine_probabilities(knowledge, unknown, mines)
+        for cell in unknown:
+            assert abs(probabilities[cell] - expected[cell]) < 1e-9
+
+
+def test_sampling_matches_brute_force():
+    exact_cells, samples = probability.EXACT_CELLS, probability.SAMPLES
+    probability.EXACT_CELLS, probability.SAMPLES = 0, 4000
+    try:
+        errors = []
+        for knowledge, unknown, mines in random_positions(40, 1):
+            expected = brute_force(knowledge, unknown, mines)
+            probabilities = mine_probabilities(knowledge, unknown, mines)
+            errors.append(max(abs(probabilities[cell] - expected[cell])
+                              for cell in unknown))
+    finally:
+        probability.EXACT_CELLS, probability.SAMPLES = exact_cells, samples
+
+    # Sampling error shrinks with more samples; biased estimates would not
+    errors.sort()
+    assert errors[len(errors) // 2] < 0.02
+    assert errors[-1] < 0.08
@@ -0,0 +1,136 @@
+import time
+
+import numpy as np
+
+from nim import NimAI
+from qtable import QTable
+
+
+def train_lockstep(n, initial=[1, 3, 5, 7], games=4096, player=None,
+                   seed=None, report_every=1.0, visits=None):
+    """
+    Train an AI by playing `n` games against itself, advancing up to
+    `games` of them together with array operations, and return it.
+
+    Every step, each game's current player chooses an epsilon-greedy
+    action from the shared `QTable` and the same Q-learning updates as
+    `train` are made: -1 for the move that ends a game, +1 for the
+    winner's last move, 0 otherwise. Updates from one step are applied
+    together, with games updating the same state and action averaging
+    their targets. Progress is printed at most every `report_every`
+    seconds, or never if it is None. To resume training, pass an AI
+    backed by a `QTable` as `player`. If `visits` is an array the size
+    of the table, the number of targets each Q-value received is added
+    to it.
+    """
+    if player is None:
+        player = NimAI(initial=initial)
+    elif not isinstance(player.q, QTable):
+        raise ValueError("Lockstep training needs a NimAI created with "
+                         "initial piles")
+    table = player.q
+    values = table.values.reshape(-1)
+    rng = np.random.default_rng(seed)
+
+    # Per game: piles in their original order, state row, player to
+    # move, and each player's last state and action in table order (-1
+    # before their first move)
+    count = min(games, n)
+    start_piles = np.array(table.initial)
+    start_state = table.encode(start_piles)
+    piles = np.tile(start_piles, (count, 1))
+    state = np.full(count, start_state)
+    mover = np.zeros(count, dtype=np.int64)
+    last_state = np.full((count, 2), -1)
+    last_action = np.full((count, 2), -1)
+    started = count
+    finished = 0
+
+    start = time.perf_counter()
+    reported = start
+    while finished < n:
+        rows = np.arange(len(state))
+
+        # Choose epsilon-greedy actions; random scores masked to the
+        # valid actions pick uniformly among them
+        action = table.values[state].argmax(axis=1)
+        explore = rng.random(len(state)) <= player.epsilon
+        if explore.any():
+            scores = rng.random((explore.sum(), table.actions))
+            scores[~table.valid[state[explore]]] = -1
+            action[explore] = scores.argmax(axis=1)
+
+        # Remove objects from the pile each action names, which for a
+        # canonical table is a position in the sorted piles
+        pile = table.action_pile_indices(piles, action)
+        piles[rows, pile] -= table.action_counts[action]
+        new_state = table.encode(piles)
+        terminal = new_state == 0
+        best_future = table.values[new_state].max(axis=1)
+        best_future[terminal] = 0
+
+        # The move ending a game loses; the opponent's last move is
+        # rewarded with the outcome and the best future from here
+        other = 1 - mover
+        waiting = last_state[rows, other] >= 0
+        update_states = np.concatenate((
+            state[terminal], last_state[rows, other][waiting]
+        ))
+        update_actions = np.concatenate((
+            action[terminal], last_action[rows, other][waiting]
+        ))
+        targets = np.concatenate((
+            np.full(terminal.sum(), -1.0),
+            (terminal + best_future)[waiting]
+        ))
+        update(values, table.actions, update_states, update_actions,
+               targets, player.alpha, visits)
+
+        last_state[rows, mover] = state
+        last_action[rows, mover] = action
+        state = new_state
+        mover = other
+
+        # Start new games in place of finished ones while any remain,
+        # and drop the rest
+        done = np.flatnonzero(terminal)
+        finished += len(done)
+        restart = done[:max(0, min(len(done), n - started))]
+        started += len(restart)
+        piles[restart] = start_piles
+        state[restart] = start_state
+        mover[restart] = 0
+        last_state[restart] = -1
+        last_action[restart] = -1
+        if len(restart) < len(done):
+            keep = np.ones(len(state), dtype=bool)
+            keep[done[len(restart):]] = False
+            piles, state, mover = piles[keep], state[keep], mover[keep]
+            last_state, last_action = last_state[keep], last_action[keep]
+
+        now = time.perf_counter()
+        if report_every is not None and now - reported >= report_every:
+            reported = now
+            print(f"Played {finished} of {n} training games "
+                  f"({finished / (now - start):.0f} games/s)")
+
+    if report_every is not None:
+        elapsed = time.perf_counter() - start
+        print(f"Done training: {n} games in {elapsed:.2f}s")
+    return player
+
+
+def update(values, actions, states, chosen, targets, alpha, visits=None):
+    """
+    Moves each Q-value in the flattened table `values` a fraction
+    `alpha` towards the mean of its targets in this batch, counting
+    the targets in `visits` if given.
+    """
+    if not len(states):
+        return
+    keys, inverse = np.unique(states * actions + chosen, return_inverse=True)
+    counts = np.bincount(inverse)
+    means = np.bincount(inverse, weights=targets) / counts
+    values[keys] += alpha * (means - values[keys])
+    if visits is not None:
+        visits[keys] += counts
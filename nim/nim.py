@@ -2,6 +2,8 @@ import math
 import random
 import time
 
+from qtable import QTable
+
 
 class Nim():
 
@@ -72,7 +74,8 @@ class Nim():
 
 class NimAI():
 
-    def __init__(self, alpha=0.5, epsilon=0.1):
+    def __init__(self, alpha=0.5, epsilon=0.1, initial=None,
+                 canonical=False):
         """
         Initialize AI with an empty Q-learning dictionary,
         an alpha (learning) rate, and an epsilon rate.
@@ -81,11 +84,42 @@ class NimAI():
         pairs to a Q-value (a number).
          - `state` is a tuple of remaining piles, e.g. (1, 1, 4, 4)
          - `action` is a tuple `(i, j)` for an action
+
+        If the `initial` piles are given, Q-values are instead kept in
+        a `QTable` array covering every state reachable from them.
+
+        If `canonical` is True, states that differ only in the order of
+        their piles share Q-values: states are stored with sorted piles,
+        and actions with the position of their pile in the sorted state.
         """
-        self.q = dict()
+        self.canonical = canonical
+        self.q = dict() if initial is None else QTable(initial, canonical)
         self.alpha = alpha
         self.epsilon = epsilon
 
+    def save(self, filename):
+        """
+        Save the Q-values, piles and hyperparameters to `filename`.
+        Only an AI backed by a `QTable` can be saved.
+        """
+        if not isinstance(self.q, QTable):
+            raise ValueError("Only a NimAI created with initial piles "
+                             "can be saved")
+        self.q.save(filename, alpha=self.alpha, epsilon=self.epsilon)
+
+    @classmethod
+    def load(cls, filename, mode="r"):
+        """
+        Load an AI saved with `save`, memory-mapping its Q-values.
+        The default mode "r" is read-only, for playing; use "r+" to
+        keep training and write the updates back to the file.
+        """
+        table, hyperparameters = QTable.load(filename, mode)
+        ai = cls(**hyperparameters)
+        ai.q = table
+        ai.canonical = table.canonical
+        return ai
+
     def update(self, old_state, action, new_state, reward):
         """
         Update Q-learning model, given an old state, an action taken
@@ -101,9 +135,22 @@ class NimAI():
         Return the Q-value for the state `state` and the action `action`.
         If no Q-value exists yet in `self.q`, return 0.
         """
-        q_key = (tuple(state), action)
+        q_key = self.q_key(state, action)
         return self.q[q_key] if q_key in self.q else 0
 
+    def q_key(self, state, action):
+        """
+        Return the key for `state` and `action` in `self.q`. For a
+        canonical dictionary, the piles are sorted and the action's
+        pile renumbered to the first pile of its size in sorted order;
+        a `QTable` does this itself.
+        """
+        if not self.canonical or isinstance(self.q, QTable):
+            return (tuple(state), action)
+        piles = sorted(state)
+        i, j = action
+        return (tuple(piles), (piles.index(state[i]), j))
+
     def update_q_value(self, state, action, old_q, reward, future_rewards):
         """
         Update the Q-value for the state `state` and the action `action`
@@ -119,7 +166,7 @@ class NimAI():
         `alpha` is the learning rate, and `new value estimate`
         is the sum of the current reward and estimated future rewards.
         """
-        self.q[(tuple(state), action)] = old_q + self.alpha * (reward + future_rewards - old_q)
+        self.q[self.q_key(state, action)] = old_q + self.alpha * (reward + future_rewards - old_q)
 
     def best_future_reward(self, state):
         """
@@ -131,6 +178,8 @@ class NimAI():
         Q-value in `self.q`. If there are no available actions in
         `state`, return 0.
         """
+        if isinstance(self.q, QTable):
+            return self.q.best_value(state)
         actions = Nim.available_actions(state)
         if not actions:
             return 0
@@ -155,21 +204,35 @@ class NimAI():
         
         if epsilon and random.uniform(0, 1) <= self.epsilon:
             return random.choice(list(actions))
-        
+
+        if isinstance(self.q, QTable):
+            return self.q.best_action(state)
         return max(actions, key=lambda action: self.get_q_value(state, action))
 
 
-def train(n):
+def train(n, initial=[1, 3, 5, 7], array=False, player=None,
+          canonical=False):
     """
-    Train an AI by playing `n` games against itself.
+    Train an AI by playing `n` games against itself,
+    starting from the `initial` piles. If `array` is True,
+    the AI keeps its Q-values in a `QTable`, and if `canonical`
+    is True it shares them between orderings of the piles.
+    To resume training, pass an existing AI as `player`.
     """
 
-    player = NimAI()
+    if player is None:
+        player = NimAI(initial=initial if array else None,
+                       canonical=canonical)
+    elif isinstance(player.q, QTable):
+        initial = list(player.q.initial)
 
-    # Play n games
+    # Play n games, reporting progress at most once a second
+    reported = time.perf_counter()
     for i in range(n):
-        print(f"Playing training game {i + 1}")
-        game = Nim()
+        if time.perf_counter() - reported >= 1:
+            reported = time.perf_counter()
+            print(f"Playing training game {i + 1}")
+        game = Nim(initial)
 
         # Keep track of last move made by either player
         last = {
@@ -218,9 +281,9 @@ def train(n):
     return player
 
 
-def play(ai, human_player=None):
+def play(ai, human_player=None, initial=[1, 3, 5, 7]):
     """
-    Play human game against the AI.
+    Play human game against the AI, starting from the `initial` piles.
     `human_player` can be set to 0 or 1 to specify whether
     human player moves first or second.
     """
@@ -230,7 +293,7 @@ def play(ai, human_player=None):
         human_player = random.randint(0, 1)
 
     # Create new game
-    game = Nim()
+    game = Nim(initial)
 
     # Game loop
     while True:
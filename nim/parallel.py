@@ -0,0 +1,149 @@
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from lockstep import train_lockstep
+from nim import NimAI
+
+ROUND_GAMES = 20000
+TARGET = 1.0
+MAX_GAMES = 10 ** 7
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python parallel.py [processes] [piles]")
+    processes = int(sys.argv[1]) if len(sys.argv) >= 2 else os.cpu_count()
+    initial = [int(pile) for pile in sys.argv[2].split(",")] \
+        if len(sys.argv) == 3 else [1, 3, 5, 7]
+
+    print(f"Training on piles {initial} until greedy play is optimal in "
+          f"{TARGET:.0%} of winning positions")
+    print(f"{'trainer':>10} {'processes':>9} {'canonical':>9} {'games':>10} "
+          f"{'seconds':>9} {'accuracy':>9}")
+    for canonical in [False, True]:
+        for name, trainer, count in [
+            ("single", train_rounds, 1),
+            ("parallel", train_parallel, processes),
+        ]:
+            start = time.perf_counter()
+            player, games = trainer(initial, count, canonical)
+            elapsed = time.perf_counter() - start
+            print(f"{name:>10} {count:>9} {str(canonical):>9} {games:>10} "
+                  f"{elapsed:>9.2f} {optimal_accuracy(player):>9.4f}")
+
+
+def optimal_accuracy(player):
+    """
+    Returns the fraction of winning positions, for misère Nim as played
+    by `Nim`, in which `player`'s greedy action moves to a losing one.
+    """
+    table = player.q
+    piles = table.decode(np.arange(table.states))
+    losing = losing_positions(piles)
+
+    winning = np.flatnonzero(~losing)
+    winning = winning[winning != 0]
+    action = table.values[winning].argmax(axis=1)
+    after = piles[winning].copy()
+    after[np.arange(len(winning)), table.action_piles[action]] -= \
+        table.action_counts[action]
+    return losing_positions(after).mean()
+
+
+def losing_positions(piles):
+    """
+    Returns whether each row of `piles` is lost for the player to move.
+    That is when some pile has more than one object and the piles'
+    nim-sum is 0, or when every pile has at most one object and the
+    nim-sum is 1.
+    """
+    nim_sum = np.bitwise_xor.reduce(piles, axis=1)
+    return np.where(piles.max(axis=1) > 1, nim_sum == 0, nim_sum == 1)
+
+
+def train_rounds(initial, processes=1, canonical=False, target=TARGET,
+                 max_games=MAX_GAMES):
+    """
+    Trains in one process with `train_lockstep`, `ROUND_GAMES` games at a
+    time, until `optimal_accuracy` reaches `target` or `max_games` games
+    have been played. Returns the AI and the number of games played.
+    """
+    player = NimAI(initial=initial, canonical=canonical)
+    games = 0
+    while games < max_games and optimal_accuracy(player) < target:
+        train_lockstep(ROUND_GAMES, player=player, seed=games,
+                       report_every=None)
+        games += ROUND_GAMES
+    return player, games
+
+
+def train_round(job):
+    """
+    Plays one round of self-play in a worker from the merged Q-values,
+    returning the new Q-values and how many targets each one received.
+    """
+    initial, canonical, alpha, epsilon, values, games, seed = job
+    player = NimAI(alpha=alpha, epsilon=epsilon, initial=initial,
+                   canonical=canonical)
+    player.q.values[:] = values
+    visits = np.zeros(values.size)
+    train_lockstep(games, player=player, seed=seed, report_every=None,
+                   visits=visits)
+    return player.q.values, visits.reshape(values.shape)
+
+
+def merge(values, results, weighted=True):
+    """
+    Returns the Q-values merged from each worker's `(values, visits)`.
+
+    Weighted by visits, each entry moves from `values` by the average of
+    the workers' changes to it, weighted by how many targets each worker
+    gave it; entries no worker visited are unchanged. Otherwise the
+    workers' tables are simply averaged.
+    """
+    if not weighted:
+        return np.mean([result for result, _ in results], axis=0)
+    valid = np.isfinite(values)
+    change = np.zeros(values.shape)
+    total = np.zeros(values.shape)
+    for result, visits in results:
+        change[valid] += visits[valid] * (result[valid] - values[valid])
+        total += visits
+    merged = values.copy()
+    visited = total > 0
+    merged[visited] += change[visited] / total[visited]
+    return merged
+
+
+def train_parallel(initial, processes=None, canonical=False, target=TARGET,
+                   max_games=MAX_GAMES, weighted=True, seed=0):
+    """
+    Trains with one `train_lockstep` worker per process, each with its
+    own seed, merging the workers' Q-tables after every round of
+    `ROUND_GAMES` games each, until `optimal_accuracy` reaches `target`
+    or `max_games` games have been played. Returns the AI and the
+    number of games played.
+    """
+    processes = processes or os.cpu_count()
+    player = NimAI(initial=initial, canonical=canonical)
+    seeds = np.random.SeedSequence(seed)
+    games = 0
+    with multiprocessing.Pool(processes) as pool:
+        while games < max_games and optimal_accuracy(player) < target:
+            jobs = [
+                (initial, canonical, player.alpha, player.epsilon,
+                 player.q.values, ROUND_GAMES, child)
+                for child in seeds.spawn(processes)
+            ]
+            results = pool.map(train_round, jobs)
+            player.q.values[:] = merge(player.q.values, results, weighted)
+            games += ROUND_GAMES * processes
+    return player, games
+
+
+if __name__ == "__main__":
+    main()
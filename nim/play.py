@@ -1,4 +1,16 @@
-from nim import train, play
+import os
+import sys
 
-ai = train(10000)
-play(ai)
+from nim import NimAI, train, play
+
+if len(sys.argv) > 2:
+    sys.exit("Usage: python play.py [policy]")
+POLICY = sys.argv[1] if len(sys.argv) == 2 else "nim.policy"
+
+# Load a saved policy, or train one and save it for next time
+if os.path.exists(POLICY):
+    ai = NimAI.load(POLICY)
+else:
+    ai = train(10000, array=True)
+    ai.save(POLICY)
+play(ai, initial=list(ai.q.initial))
@@ -0,0 +1,220 @@
+import json
+import struct
+
+import numpy as np
+
+# Start of every file written by QTable.save
+MAGIC = b"NIMQTBL\0"
+
+
+class QTable():
+    """
+    Q-values for every state and action of one Nim configuration, stored
+    in a dense NumPy array. Actions not available in a state hold -inf,
+    so the best action is a plain maximum over the state's row.
+
+    A state (tuple of remaining piles) is numbered by mixed-radix
+    encoding, pile `i` being a digit in base `initial[i] + 1`, and an
+    action `(i, j)` by its offset `sum(initial[:i]) + j - 1`, so
+    `values[state_index, action_index]` is the Q-value. Lookups also
+    accept `(state, action)` keys like the dictionary `NimAI.q`.
+
+    If `canonical` is True, every ordering of the same piles shares one
+    row: states are sorted before encoding against the sorted initial
+    piles, only sorted states get rows, and actions are numbered by the
+    position of their pile in the sorted state. Equal piles all map to
+    the first of them, since taking from any of them is the same move.
+
+    An existing array of Q-values, such as a memory map, can be passed
+    as `values` instead of starting from zeros.
+    """
+
+    def __init__(self, initial, canonical=False, values=None):
+        self.initial = tuple(initial)
+        self.canonical = canonical
+        shape = sorted(initial) if canonical else list(initial)
+
+        # Place value of each pile in a state index
+        strides = [1] * len(shape)
+        for i in range(len(shape) - 2, -1, -1):
+            strides[i] = strides[i + 1] * (shape[i + 1] + 1)
+        self.strides = np.array(strides, dtype=np.int64)
+        self.stride_list = strides
+        size = int(np.prod([pile + 1 for pile in shape]))
+
+        # First action index of each pile
+        self.offsets = np.concatenate(([0], np.cumsum(shape)[:-1]))
+        self.offset_list = self.offsets.tolist()
+        self.actions = int(sum(shape))
+
+        # Pile and count of each action index
+        self.action_piles = np.repeat(np.arange(len(shape)), shape)
+        self.action_counts = np.arange(self.actions) - \
+            self.offsets[self.action_piles] + 1
+
+        # Piles of every state index; canonical tables keep only sorted
+        # states, mapping each index to its row
+        piles = np.arange(size)[:, None] // self.strides % \
+            (np.array(shape) + 1)
+        self.rows = None
+        if canonical:
+            kept = np.all(piles[:, :-1] <= piles[:, 1:], axis=1)
+            self.rows = np.full(size, -1)
+            self.rows[kept] = np.arange(kept.sum())
+            piles = piles[kept]
+        self.piles = piles
+        self.states = len(piles)
+
+        # valid[s, a] is whether action a can be taken in state s
+        self.valid = piles[:, self.action_piles] >= self.action_counts
+        if canonical:
+            repeated = np.zeros(piles.shape, dtype=bool)
+            repeated[:, 1:] = piles[:, 1:] == piles[:, :-1]
+            self.valid &= ~repeated[:, self.action_piles]
+        if values is None:
+            values = np.ascontiguousarray(np.where(self.valid, 0.0, -np.inf))
+        elif values.shape != self.valid.shape:
+            raise ValueError("Q-values have the wrong shape for the piles")
+        self.values = values
+
+    def encode(self, piles):
+        """
+        Returns the row of a state, or an array of rows given an array
+        with one state per row.
+        """
+        if isinstance(piles, np.ndarray):
+            if self.canonical:
+                piles = np.sort(piles, axis=-1)
+            index = piles @ self.strides
+            return index if self.rows is None else self.rows[index]
+        if self.canonical:
+            piles = sorted(piles)
+        index = sum(pile * stride
+                    for pile, stride in zip(piles, self.stride_list))
+        return index if self.rows is None else int(self.rows[index])
+
+    def decode(self, rows):
+        """
+        Returns an array with the state of each row, one per row,
+        with piles sorted for a canonical table.
+        """
+        return self.piles[rows]
+
+    def order(self, state):
+        """
+        Returns the original index of each pile of `state` in table
+        order: sorted for a canonical table, unchanged otherwise.
+        """
+        if self.canonical:
+            return sorted(range(len(state)), key=state.__getitem__)
+        return list(range(len(state)))
+
+    def action_index(self, action, state=None):
+        """
+        Returns the index of `action`, taken in `state`, whose pile
+        is remapped to table order for a canonical table.
+        """
+        i, j = action
+        if self.canonical:
+            i = sorted(state).index(state[i])
+        return self.offset_list[i] + j - 1
+
+    def action(self, index, state=None):
+        """
+        Returns the action `(i, j)` with the given index, with `i`
+        remapped to the pile's position in `state` for a canonical table.
+        """
+        i = int(self.action_piles[index])
+        if self.canonical:
+            i = self.order(state)[i]
+        return (i, int(self.action_counts[index]))
+
+    def action_pile_indices(self, piles, actions):
+        """
+        Returns, for each row of `piles` and the action index at the same
+        position of `actions`, the original index of the pile the action
+        takes from: the array form of `action`. Ties between equal piles
+        go to the first of them, the same as the stable sort in `order`.
+        """
+        pile = self.action_piles[actions]
+        if self.canonical:
+            order = np.argsort(piles, axis=1, kind="stable")
+            pile = order[np.arange(len(piles)), pile]
+        return pile
+
+    def __contains__(self, key):
+        state, action = key
+        return bool(self.valid[self.encode(state),
+                               self.action_index(action, state)])
+
+    def __getitem__(self, key):
+        state, action = key
+        return float(
+            self.values[self.encode(state), self.action_index(action, state)]
+        )
+
+    def __setitem__(self, key, value):
+        state, action = key
+        self.values[self.encode(state),
+                    self.action_index(action, state)] = value
+
+    def best_value(self, state):
+        """
+        Returns the highest Q-value of any action available in `state`,
+        or 0 if there are none.
+        """
+        best = self.values[self.encode(state)].max()
+        return 0 if best == -np.inf else float(best)
+
+    def best_action(self, state):
+        """
+        Returns the available action with the highest Q-value in
+        `state`, or None if there are none.
+        """
+        row = self.encode(state)
+        if row == 0:
+            return None
+        return self.action(self.values[row].argmax(), state)
+
+    def save(self, filename, **hyperparameters):
+        """
+        Writes the table to `filename` in a binary format that `load` can
+        memory-map: a magic string, the length of a JSON header holding
+        the initial piles, whether states are canonical and any
+        `hyperparameters`, the header itself
+        padded to a multiple of 64 bytes, then the Q-values as
+        little-endian float64 in row-major order.
+        """
+        header = json.dumps({
+            "initial": list(self.initial),
+            "canonical": self.canonical,
+            "shape": [self.states, self.actions],
+            "hyperparameters": hyperparameters,
+        }).encode()
+        start = len(MAGIC) + 4 + len(header)
+        header += b" " * (-start % 64)
+        with open(filename, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            f.write(self.values.astype("<f8").tobytes())
+
+    @classmethod
+    def load(cls, filename, mode="r"):
+        """
+        Memory-maps a table written by `save`, returning the table and
+        its hyperparameters. With the default mode "r" the values are
+        read-only; "r+" writes updates back to the file and "c" keeps
+        them in memory only.
+        """
+        with open(filename, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{filename} is not a Q-table file")
+            length, = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(length))
+        values = np.memmap(
+            filename, dtype="<f8", mode=mode,
+            offset=len(MAGIC) + 4 + length, shape=tuple(header["shape"])
+        )
+        table = cls(header["initial"], header.get("canonical", False), values)
+        return table, header["hyperparameters"]
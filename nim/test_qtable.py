@@ -0,0 +1,153 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from lockstep import train_lockstep
+from nim import Nim, NimAI
+from qtable import QTable
+
+
+def all_states(initial):
+    return [list(state)
+            for state in itertools.product(*[range(p + 1) for p in initial])]
+
+
+def test_encoding_is_mixed_radix():
+    initial = [1, 3, 5, 7]
+    table = QTable(initial)
+    states = all_states(initial)
+    rows = [table.encode(state) for state in states]
+    for state, row in zip(states, rows):
+        assert row == ((state[0] * 4 + state[1]) * 6 + state[2]) * 8 + \
+            state[3]
+        assert table.decode(row).tolist() == state
+    assert sorted(rows) == list(range(table.states))
+    assert table.encode(np.array(states)).tolist() == rows
+
+
+def test_canonical_rows_are_shared_by_orderings():
+    initial = [3, 1, 3, 2]
+    table = QTable(initial, canonical=True)
+    rows = {}
+    for state in all_states(initial):
+        row = table.encode(state)
+        assert table.decode(row).tolist() == sorted(state)
+        for ordering in itertools.permutations(state):
+            assert table.encode(list(ordering)) == row
+        rows.setdefault(tuple(sorted(state)), row)
+    assert sorted(rows.values()) == list(range(table.states))
+    assert table.encode(np.array(all_states(initial))).tolist() == [
+        rows[tuple(sorted(state))] for state in all_states(initial)
+    ]
+
+
+@pytest.mark.parametrize("canonical", [False, True])
+def test_action_indices_round_trip(canonical):
+    initial = [3, 1, 3, 2]
+    table = QTable(initial, canonical=canonical)
+    for state in all_states(initial):
+        row = table.encode(state)
+        for i, j in Nim.available_actions(state):
+            index = table.action_index((i, j), state)
+            assert table.valid[row, index]
+            pile, count = table.action(index, state)
+            assert count == j
+            if canonical:
+                # Equal piles are the same move, so any of them will do
+                assert state[pile] == state[i]
+                assert table.order(state)[table.action_piles[index]] == pile
+            else:
+                assert pile == i
+                assert table.order(state) == list(range(len(state)))
+
+
+def test_repeated_piles_are_masked():
+    table = QTable([3, 1, 3, 2], canonical=True)
+    for state in all_states([3, 1, 3, 2]):
+        row = table.encode(state)
+        distinct = {(pile, j) for pile in state for j in range(1, pile + 1)}
+        assert table.valid[row].sum() == len(distinct)
+        assert np.isneginf(table.values[row][~table.valid[row]]).all()
+
+
+@pytest.mark.parametrize("canonical", [False, True])
+def test_action_pile_indices_match_action(canonical):
+    random.seed(0)
+    table = QTable([3, 1, 3, 2], canonical=canonical)
+    states = [state for state in all_states(table.initial) if sum(state)]
+    actions = [
+        table.action_index(random.choice(sorted(
+            Nim.available_actions(state)
+        )), state)
+        for state in states
+    ]
+    piles = table.action_pile_indices(np.array(states), np.array(actions))
+    assert piles.tolist() == [
+        table.action(action, state)[0]
+        for state, action in zip(states, actions)
+    ]
+
+
+def test_lockstep_moves_stay_legal_with_repeated_piles():
+    player = NimAI(epsilon=1, initial=[2, 2, 3, 3], canonical=True)
+    train_lockstep(2000, player=player, games=64, seed=0,
+                   report_every=None)
+    table = player.q
+    assert np.isfinite(table.values[table.valid]).all()
+    assert np.isneginf(table.values[~table.valid]).all()
+    assert (table.values[table.valid] != 0).any()
+
+
+def test_save_load_round_trip(tmp_path):
+    filename = tmp_path / "nim.policy"
+    ai = NimAI(alpha=0.25, epsilon=0.05, initial=[3, 1, 2], canonical=True)
+    ai.q.values[ai.q.valid] = np.arange(ai.q.valid.sum()) / 10
+    ai.save(filename)
+
+    loaded = NimAI.load(filename)
+    assert (loaded.alpha, loaded.epsilon) == (0.25, 0.05)
+    assert loaded.canonical and loaded.q.initial == (3, 1, 2)
+    assert np.array_equal(loaded.q.values, ai.q.values)
+    assert np.array_equal(loaded.q.valid, ai.q.valid)
+    with pytest.raises(ValueError):
+        loaded.q.values[0, 0] = 1
+
+    filename.write_bytes(b"not a table")
+    with pytest.raises(ValueError):
+        NimAI.load(filename)
+
+
+def test_canonical_table_matches_canonical_dict():
+    random.seed(0)
+    initial = [3, 1, 3, 2]
+    lookup = NimAI(canonical=True)
+    table = NimAI(initial=initial, canonical=True)
+    for _ in range(3000):
+        state = [random.randint(0, pile) for pile in initial]
+        if not sum(state):
+            continue
+        action = random.choice(sorted(Nim.available_actions(state)))
+        new_state = list(state)
+        new_state[action[0]] -= action[1]
+        reward = random.choice([-1, 0, 1])
+        lookup.update(state, action, new_state, reward)
+        table.update(state, action, new_state, reward)
+
+    for state in all_states(initial):
+        actions = Nim.available_actions(state)
+        for action in actions:
+            assert table.get_q_value(state, action) == \
+                pytest.approx(lookup.get_q_value(state, action))
+        assert table.best_future_reward(state) == \
+            pytest.approx(lookup.best_future_reward(state))
+
+        best = table.choose_action(state, epsilon=False)
+        if not actions:
+            assert best is None
+            continue
+        assert best in actions
+        assert lookup.get_q_value(state, best) == pytest.approx(
+            max(lookup.get_q_value(state, action) for action in actions)
+        )